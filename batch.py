@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# Comparaisons en lot sans interface graphique : liste de paires (CSV/JSON) -> résultats CSV/JSONL.
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+import stats
+from club_index import ClubIndex
+from data_cache import cache_dir, load_table, source_key
+from pair_index import PairIndex
+from rolling import PRESETS, ClubSeries, Window
+
+
+@dataclass
+class ComparisonData:
+    # Seulement ce qu'utilise stats.compare (ni Elo, ni modèle de buts, ni joueurs, ni recherche)
+    data_dir: str
+    clubs: pd.DataFrame
+    club_index: ClubIndex
+    pair_index: PairIndex
+    club_series: ClubSeries
+
+
+# Index du processus courant (hérités par fork, ou relus depuis les .npy mappés en mémoire)
+_DATA = None
+
+
+def load_comparison_data(data_dir):
+    games = load_table(data_dir, 'games')
+    source = source_key(data_dir, 'games')
+    # Les index sont écrits sur disque une fois : chaque processus les mappe au lieu de les recalculer
+    return ComparisonData(
+        data_dir=data_dir,
+        clubs=load_table(data_dir, 'clubs'),
+        club_index=ClubIndex.load_or_build(os.path.join(data_dir, 'club_index.pkl'), games, source),
+        pair_index=PairIndex.load_or_build(cache_dir(data_dir, 'pair_index'), games, source),
+        club_series=ClubSeries.load_or_build(cache_dir(data_dir, 'club_series'), games, source),
+    )
+
+
+def _load(data_dir):
+    global _DATA
+    if _DATA is None:
+        # Les messages de chargement ne doivent pas se mélanger à la sortie
+        with redirect_stdout(sys.stderr):
+            if data_dir is None:
+                # Import tardif : dataset importe aussi Elo, modèle de buts, etc. ; les processus de calcul
+                # reçoivent toujours un dossier déjà résolu
+                from dataset import resolve_data_dir
+                data_dir = resolve_data_dir(progress=lambda message: print(message, file=sys.stderr))
+            _DATA = load_comparison_data(data_dir)
+    return _DATA
+
+
+def _init_worker(data_dir):
+    _load(data_dir)
+
+
+# ----- Lecture des paires -----
+def read_pairs(path):
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            return list(csv.DictReader(f))
+        text = f.read().strip()
+    if text.startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def parse_window(row):
+    # "5 ans", "5", "all" / vide, ou bien des colonnes since / until
+    since, until = row.get('since') or None, row.get('until') or None
+    if since or until:
+        return Window.between(since, until)
+    value = str(row.get('window') or '').strip()
+    if not value or value.lower() in ('all', 'tout'):
+        return Window()
+    if value in PRESETS:
+        return Window.last_years(PRESETS[value])
+    return Window.last_years(int(value))
+
+
+def _resolve(value, ids_by_name, known_ids):
+    value = str(value).strip()
+    if value.lstrip('-').isdigit():
+        if int(value) not in known_ids:
+            raise ValueError(f"club introuvable : {value}")
+        return int(value)
+    if value not in ids_by_name:
+        raise ValueError(f"club introuvable : {value}")
+    return ids_by_name[value]
+
+
+def build_tasks(rows, data):
+    ids_by_name = dict(zip(data.clubs['name'].astype(str), data.clubs['club_id'].tolist()))
+    known_ids = set(data.clubs['club_id'].tolist())
+    tasks = []
+    for i, row in enumerate(rows):
+        try:
+            club1_id = _resolve(row['club1'], ids_by_name, known_ids)
+            club2_id = _resolve(row['club2'], ids_by_name, known_ids)
+            window = parse_window(row)
+        except (KeyError, ValueError) as e:
+            print(f"Ligne {i + 1} ignorée : {e}", file=sys.stderr)
+            continue
+        tasks.append((i, club1_id, club2_id, window))
+    return tasks
+
+
+# ----- Calcul -----
+def comparison_record(comparison, names):
+    window = comparison.window
+    record = {
+        'club1_id': comparison.club1_id,
+        'club1': names.get(comparison.club1_id, ''),
+        'club2_id': comparison.club2_id,
+        'club2': names.get(comparison.club2_id, ''),
+        'window': window.label,
+        'since': f"{window.since:%Y-%m-%d}" if window.since is not None else '',
+        'until': f"{window.until:%Y-%m-%d}" if window.until is not None else '',
+    }
+    for prefix, club in (('club1', comparison.club1), ('club2', comparison.club2),
+                         ('club1_window', comparison.club1_window), ('club2_window', comparison.club2_window)):
+        record.update({f'{prefix}_{k}': v for k, v in asdict(club).items()})
+        record[f'{prefix}_winrate'] = round(club.winrate, 4)
+    for prefix, h2h in (('h2h', comparison.head_to_head), ('h2h_window', comparison.head_to_head_window)):
+        record.update({f'{prefix}_{k}': v for k, v in asdict(h2h).items()})
+        # Probabilités avec la loi de Laplace, comme dans l'interface
+        record[f'{prefix}_proba1'] = round(h2h.proba1, 4)
+        record[f'{prefix}_proba2'] = round(h2h.proba2, 4)
+        record[f'{prefix}_proba_draw'] = round(h2h.proba_draw, 4)
+    return record
+
+
+def compare_task(task):
+    i, club1_id, club2_id, window = task
+    data = _DATA
+    comparison = stats.compare(club1_id, club2_id, data.club_index, data.pair_index, data.club_series, window)
+    return i, comparison
+
+
+def run(tasks, data_dir, workers, chunksize):
+    if workers <= 1:
+        yield from map(compare_task, tasks)
+        return
+    # fork : les tableaux déjà chargés sont partagés (copie à l'écriture), rien n'est picklé par tâche.
+    # spawn : chaque processus mappe les index .npy déjà écrits par le processus principal (rien n'est recalculé).
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+    with context.Pool(workers, initializer=_init_worker, initargs=(data_dir,)) as pool:
+        yield from pool.imap(compare_task, tasks, chunksize=chunksize)
+
+
+# ----- Écriture -----
+def write_results(results, names, out, fmt):
+    writer = None
+    count = 0
+    for _, comparison in results:
+        record = comparison_record(comparison, names)
+        if fmt == 'jsonl':
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=list(record))
+                writer.writeheader()
+            writer.writerow(record)
+        count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comparaisons de clubs en lot (sans interface)")
+    parser.add_argument("pairs", help="Fichier CSV, JSON ou JSONL : club1, club2 (id ou nom), window / since / until")
+    parser.add_argument("-o", "--output", help="Fichier de sortie (défaut : sortie standard)")
+    parser.add_argument("-f", "--format", choices=["csv", "jsonl"],
+                        help="Format de sortie (défaut : d'après l'extension, sinon csv)")
+    parser.add_argument("--data-dir", help="Dossier local du jeu de données (pas de téléchargement Kaggle)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Nombre de processus (1 = pas de pool)")
+    parser.add_argument("--chunksize", type=int, default=256, help="Paires envoyées par lot à chaque processus")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('jsonl' if args.output and args.output.endswith('.jsonl') else 'csv')
+    data = _load(args.data_dir)
+    tasks = build_tasks(read_pairs(args.pairs), data)
+    names = dict(zip(data.clubs['club_id'].tolist(), data.clubs['name'].astype(str)))
+
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        count = write_results(run(tasks, data.data_dir, args.workers, args.chunksize), names, out, fmt)
+    finally:
+        if args.output:
+            out.close()
+    print(f"{count} comparaisons écrites", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
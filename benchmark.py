@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+# Banc d'essai sans interface graphique : temps et pic mémoire par étape (chargement CSV, filtre de la période récente,
+# recherche à chaque frappe, comparaison complète, face-à-face de toutes les paires), sur un dossier existant
+# ou sur un jeu synthétique généré pour l'occasion (synthetic.py).
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import player_stats
+from club_index import ClubIndex
+from data_cache import load_tables, rss_mb
+from dataset import RECENT_YEARS, Dataset
+from elo import EloRatings
+from goal_model import GoalModel
+from pair_index import PairIndex
+from report import build_report
+from rolling import ClubSeries, Window
+from search import SEARCH_LIMIT, ClubSearchIndex
+from synthetic import generate
+
+STAGES = ['load_csv', 'load_cache', 'recent_filter', 'indexes', 'filter_clubs', 'compare_clubs', 'all_pairs_h2h']
+SAMPLE_INTERVAL = 0.005
+# Écart absolu en dessous duquel un ralentissement n'est que du bruit de mesure
+MIN_SLOWDOWN = {'seconds': 0.05, 'mean_ms': 1.0}
+
+
+class MemorySampler:
+    # Pic de mémoire résidente pendant une étape (numpy / pandas compris), relevé par un thread
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start = self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+
+    def __enter__(self):
+        self.start = self.peak = rss_mb()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_mb())
+
+
+class Benchmark:
+    def __init__(self, trace_memory=True, progress=print):
+        self.results = []
+        self.trace_memory = trace_memory
+        self.progress = progress
+
+    def stage(self, name, func, setup=None):
+        # La RSS ne redescend pas quand la mémoire libérée est réutilisée : si trace_memory, l'étape est rejouée
+        # sous tracemalloc pour mesurer son pic d'allocations (les temps viennent de la première exécution)
+        self.progress(f"{name}...")
+        if setup:
+            setup()
+        with MemorySampler() as memory:
+            start = time.perf_counter()
+            value = func()
+            elapsed = time.perf_counter() - start
+        result = {'stage': name, 'seconds': elapsed, 'peak_mb': memory.peak - memory.start, 'rss_mb': memory.peak}
+        if self.trace_memory:
+            if setup:
+                setup()
+            tracemalloc.start()
+            try:
+                func()
+                result['alloc_peak_mb'] = tracemalloc.get_traced_memory()[1] / 2**20
+            finally:
+                tracemalloc.stop()
+        self.results.append(result)
+        return value
+
+    def repeated(self, name, func, items):
+        # Une durée par appel (par frappe, par comparaison) : moyenne, 95e centile et maximum
+        runs = []
+
+        def loop():
+            timings = []
+            for item in items:
+                start = time.perf_counter()
+                func(item)
+                timings.append(time.perf_counter() - start)
+            runs.append(timings)
+        self.stage(name, loop)
+        timings = np.asarray(runs[0]) * 1000
+        self.results[-1].update(count=len(timings), mean_ms=float(timings.mean()),
+                                p95_ms=float(np.percentile(timings, 95)), max_ms=float(timings.max()))
+
+
+def run(data_dir, stages=STAGES, keystrokes=20, comparisons=20, seed=0, trace_memory=True, progress=print):
+    bench = Benchmark(trace_memory, progress)
+    rng = np.random.default_rng(seed)
+
+    # ----- Chargement -----
+    if 'load_csv' in stages:
+        # À froid : lecture des CSV et écriture du cache colonnaire
+        bench.stage('load_csv', lambda: load_tables(data_dir),
+                    setup=lambda: shutil.rmtree(os.path.join(data_dir, '.cache'), ignore_errors=True))
+    tables = bench.stage('load_cache', lambda: load_tables(data_dir)) if 'load_cache' in stages else load_tables(data_dir)
+    clubs, games, players = tables['clubs'], tables['games'], tables['players']
+    cutoff_date = datetime.now() - timedelta(days=RECENT_YEARS*365)
+
+    if 'recent_filter' in stages:
+        # Filtre des 5 dernières années tel qu'il était appliqué à chaque comparaison
+        bench.stage('recent_filter', lambda: games[games['date'] >= cutoff_date])
+
+    # ----- Index (construits sans relire les fichiers .pkl / .npz) -----
+    builders = {
+        'club_index': lambda: ClubIndex.build(games),
+        'pair_index': lambda: PairIndex(games),
+        'club_series': lambda: ClubSeries(games),
+        'ratings': lambda: EloRatings.build(games),
+        'goal_model': lambda: GoalModel.fit(games),
+        'search_index': lambda: ClubSearchIndex(clubs['name'].astype(str).tolist()),
+    }
+    indexes = {name: bench.stage(f'indexes.{name}', build) if 'indexes' in stages else build()
+               for name, build in builders.items()}
+    with redirect_stdout(sys.stderr):
+        squads = player_stats.load_or_build(data_dir, progress=lambda message: None)
+    data = Dataset(data_dir=data_dir, clubs=clubs, games=games, players=players, cutoff_date=cutoff_date,
+                   player_stats=squads, **indexes)
+    names = data.search_index.names
+
+    # ----- Recherche : une requête par frappe, comme _run_filter -----
+    if 'filter_clubs' in stages:
+        typed = [name[:i] for name in rng.choice(names, min(keystrokes, len(names)), replace=False)
+                 for i in range(1, len(name) + 1)]
+        bench.repeated('filter_clubs', lambda query: data.search_index.search(query, limit=SEARCH_LIMIT), typed)
+
+    # ----- Comparaison complète (sans cache), comme compute_comparison -----
+    if 'compare_clubs' in stages:
+        window = Window.last_years(RECENT_YEARS)
+        pairs = [tuple(rng.choice(names, 2, replace=False)) for _ in range(comparisons)]
+        bench.repeated('compare_clubs', lambda pair: build_report(data, pair[0], pair[1], window), pairs)
+
+    # ----- Face-à-face de toutes les paires (matrices creuses) -----
+    if 'all_pairs_h2h' in stages:
+        bench.stage('all_pairs_h2h', lambda: data.pair_index.matrix())
+        bench.stage('all_pairs_h2h_recent', lambda: data.pair_index.matrix(Window.last_years(RECENT_YEARS)))
+
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'dataset': {'data_dir': data_dir, 'clubs': len(clubs), 'games': len(games), 'players': len(players)},
+        'stages': bench.results,
+    }
+
+
+# ----- Rapport -----
+def format_results(report):
+    dataset = report['dataset']
+    lines = [f"{dataset['games']} matchs, {dataset['clubs']} clubs, {dataset['players']} joueurs",
+             f"{'étape':<22}{'temps':>10}{'par opération':>30}{'pic RSS':>12}{'RSS':>10}{'allocations':>14}"]
+    for r in report['stages']:
+        per_op = f"{r['mean_ms']:.2f} ms (p95 {r['p95_ms']:.2f}, n={r['count']})" if 'mean_ms' in r else ''
+        allocated = f"{r['alloc_peak_mb']:.0f} Mo" if 'alloc_peak_mb' in r else ''
+        lines.append(f"{r['stage']:<22}{r['seconds']:>9.3f}s{per_op:>30}{r['peak_mb']:>+9.0f} Mo"
+                     f"{r['rss_mb']:>7.0f} Mo{allocated:>14}")
+    return "\n".join(lines)
+
+
+def regressions(report, baseline, tolerance):
+    # Étapes plus lentes que la référence au-delà de la tolérance (temps unitaire si disponible)
+    previous = {r['stage']: r for r in baseline['stages']}
+    slower = []
+    for r in report['stages']:
+        old = previous.get(r['stage'])
+        if old is None:
+            continue
+        metric = 'mean_ms' if 'mean_ms' in r and 'mean_ms' in old else 'seconds'
+        if (old[metric] > 0 and r[metric] > old[metric] * (1 + tolerance)
+                and r[metric] - old[metric] > MIN_SLOWDOWN[metric]):
+            slower.append(f"{r['stage']} : {metric} {old[metric]:.3f} -> {r[metric]:.3f} "
+                          f"(+{r[metric] / old[metric] - 1:.0%})")
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai sans interface (temps et pic mémoire par étape)")
+    parser.add_argument("--data-dir", help="Jeu de données existant (son cache .cache/ est reconstruit) ; "
+                                           "par défaut un jeu synthétique est généré")
+    parser.add_argument("--games", type=int, default=100_000, help="Matchs du jeu synthétique")
+    parser.add_argument("--clubs", type=int, default=1_000, help="Clubs du jeu synthétique")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="Conserver le jeu synthétique généré")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--keystrokes", type=int, default=20, help="Noms de clubs tapés lettre par lettre")
+    parser.add_argument("--comparisons", type=int, default=20, help="Paires de clubs comparées")
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false",
+                        help="Ne pas rejouer les étapes sous tracemalloc (plus rapide, pic RSS seulement)")
+    parser.add_argument("-o", "--output", help="Résultats JSON (suivi des régressions)")
+    parser.add_argument("--baseline", help="Résultats JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Ralentissement toléré (0.25 = 25 %%)")
+    args = parser.parse_args(argv)
+
+    def progress(message):
+        print(message, file=sys.stderr)
+
+    data_dir = args.data_dir
+    if data_dir is None:
+        data_dir = tempfile.mkdtemp(prefix='football-bench-')
+        progress(f"Génération du jeu synthétique dans {data_dir}...")
+        generate(data_dir, games=args.games, clubs=args.clubs, seed=args.seed, progress=progress)
+    try:
+        report = run(data_dir, args.stages, args.keystrokes, args.comparisons, args.seed, args.trace_memory,
+                     progress)
+    finally:
+        if args.data_dir is None and not args.keep:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(format_results(report))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            slower = regressions(report, json.load(f), args.tolerance)
+        for line in slower:
+            print(f"Régression : {line}")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
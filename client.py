@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# Client léger du service JSON (server.py) : renvoie les mêmes objets que les calculs locaux,
+# sans télécharger ni charger le jeu de données.
+import json
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+import profiling
+from report import ComparisonReport, league_from_dict
+from search import ClubSearchIndex
+
+
+def window_params(window):
+    params = {'label': window.label}
+    if window.since is not None:
+        params['since'] = window.since.isoformat()
+    if window.until is not None:
+        params['until'] = window.until.isoformat()
+    if len(params) == 1:
+        params['window'] = 'all'
+    return params
+
+
+class ServiceClient:
+    def __init__(self, url, timeout=60):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.search_index = None
+        # Réponses servies depuis le cache du serveur (en-tête X-Cache)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, **params):
+        url = f"{self.url}{path}"
+        if params:
+            url += "?" + urlencode(params)
+        try:
+            with profiling.span(f'client{path}'), urlopen(url, timeout=self.timeout) as response:
+                if response.headers.get('X-Cache') == 'hit':
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                return json.load(response)
+        except HTTPError as e:
+            try:
+                message = json.load(e)['error']
+            except (ValueError, KeyError):
+                message = str(e)
+            raise RuntimeError(message) from None
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    # ----- Requêtes -----
+    def connect(self):
+        # Statut du serveur et liste des clubs : la recherche reste locale, sans aller-retour par frappe
+        status = self.get('/status')
+        self.search_index = ClubSearchIndex(self.get('/clubs')['names'])
+        return status
+
+    def search(self, query, limit=None):
+        return self.get('/search', q=query, **({'limit': limit} if limit else {}))['results']
+
+    def head_to_head(self, club1, club2, window):
+        return self.get('/h2h', club1=club1, club2=club2, **window_params(window))
+
+    def compare(self, club1_name, club2_name, window):
+        return ComparisonReport.from_dict(self.get('/compare', club1=club1_name, club2=club2_name,
+                                                   **window_params(window)))
+
+    def league(self, names):
+        return league_from_dict(self.get('/league', clubs=';'.join(names)))
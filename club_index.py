@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# Agrégats par club (domicile / extérieur, depuis le début) calculés une seule fois au chargement.
+# Les périodes (5 dernières années, dates choisies) viennent de rolling.ClubSeries.
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from stats import ClubStats
+
+FIELDS = ['matches', 'wins', 'draws', 'losses', 'goals_for', 'goals_against']
+SIDES = ['home', 'away']
+INDEX_VERSION = 2
+
+
+def _aggregate_side(games, side):
+    other = 'away' if side == 'home' else 'home'
+    goals_for = games[f'{side}_club_goals']
+    goals_against = games[f'{other}_club_goals']
+    frame = pd.DataFrame({
+        'club_id': games[f'{side}_club_id'].to_numpy(),
+        'matches': 1,
+        'wins': (goals_for > goals_against).to_numpy(),
+        'losses': (goals_for < goals_against).to_numpy(),
+        'goals_for': goals_for.to_numpy(),
+        'goals_against': goals_against.to_numpy(),
+    })
+    table = frame.groupby('club_id').sum()
+    table['draws'] = table['matches'] - table['wins'] - table['losses']
+    return table[FIELDS]
+
+
+class ClubIndex:
+    def __init__(self, table, source=None):
+        self.table = table
+        # data_cache.source_key de games.csv au moment du calcul
+        self.source = source
+        # Accès O(1) : club_id -> ligne d'un tableau NumPy
+        self._rows = {club_id: i for i, club_id in enumerate(table.index)}
+        self._values = table.to_numpy(dtype=np.int64)
+        self._columns = {name: i for i, name in enumerate(table.columns)}
+
+    @classmethod
+    def build(cls, games, source=None):
+        parts = []
+        for side in SIDES:
+            part = _aggregate_side(games, side)
+            part.columns = [f'{side}_{name}' for name in FIELDS]
+            parts.append(part)
+        table = pd.concat(parts, axis=1).fillna(0).astype(np.int64)
+        table.index.name = 'club_id'
+        return cls(table, source)
+
+    def stats(self, club_id, side=None):
+        sides = SIDES if side is None else [side]
+        row = self._rows.get(club_id)
+        if row is None:
+            return ClubStats(**{name: 0 for name in FIELDS})
+        values = {
+            name: int(sum(self._values[row, self._columns[f'{s}_{name}']] for s in sides))
+            for name in FIELDS
+        }
+        return ClubStats(**values)
+
+    # ----- Persistance -----
+    def save(self, path):
+        pd.to_pickle({'version': INDEX_VERSION, 'table': self.table, 'source': self.source}, path)
+
+    @classmethod
+    def load(cls, path, source):
+        # Renvoie None si le fichier est absent ou ne correspond plus aux données
+        try:
+            data = pd.read_pickle(path)
+        except (OSError, EOFError, KeyError, TypeError, pickle.UnpicklingError):
+            return None
+        if data.get('version') != INDEX_VERSION or data['source'] != source:
+            return None
+        return cls(data['table'], data['source'])
+
+    @classmethod
+    def load_or_build(cls, path, games, source):
+        index = cls.load(path, source)
+        if index is not None:
+            print(f"Index des clubs chargé depuis : {path}")
+            return index
+        index = cls.build(games, source)
+        try:
+            index.save(path)
+        except OSError as e:
+            print(f"Impossible d'enregistrer l'index des clubs : {e}")
+        return index
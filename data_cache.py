@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+# Cache colonnaire des CSV (clubs, games, players) : une colonne = un fichier .npy mappé en mémoire.
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import profiling
+
+CACHE_VERSION = 1
+
+# Colonnes réellement utilisées par l'application
+COLUMNS = {
+    'clubs': ['club_id', 'name', 'domestic_competition_id', 'total_market_value', 'squad_size'],
+    'games': ['game_id', 'competition_id', 'date', 'home_club_id', 'away_club_id',
+              'home_club_goals', 'away_club_goals'],
+    'players': ['player_id', 'name', 'current_club_id'],
+}
+INTEGERS = {'club_id', 'game_id', 'player_id', 'home_club_id', 'away_club_id', 'current_club_id',
+            'home_club_goals', 'away_club_goals', 'squad_size'}
+CATEGORIES = {'name', 'domestic_competition_id', 'competition_id'}
+DATES = {'date'}
+
+
+def cache_dir(data_dir, table):
+    return os.path.join(data_dir, '.cache', table)
+
+
+def _file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_info(path, with_hash):
+    st = os.stat(path)
+    info = {'size': st.st_size, 'mtime': st.st_mtime_ns}
+    if with_hash:
+        info['sha1'] = _file_hash(path)
+    return info
+
+
+def source_key(data_dir, table):
+    # Clé d'invalidation commune des fichiers dérivés d'un CSV (index des clubs, Elo, modèle de buts, agrégats)
+    return source_info(os.path.join(data_dir, f'{table}.csv'), with_hash=False)
+
+
+def _narrow_int(values):
+    # Plus petit type entier capable de contenir la colonne ; float32 si elle contient des NaN
+    if values.dtype.kind == 'f' and np.isnan(values).any():
+        return values.astype(np.float32)
+    if len(values) == 0:
+        return values.astype(np.int8)
+    lo, hi = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+# ----- Écriture du cache -----
+def build_cache(data_dir, table):
+    source = os.path.join(data_dir, f'{table}.csv')
+    wanted = set(COLUMNS[table])
+    with profiling.span('load.csv'):
+        df = pd.read_csv(source, usecols=lambda c: c in wanted)
+    profiling.count('rows.csv', len(df))
+
+    target = cache_dir(data_dir, table)
+    tmp = target + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        if name in DATES:
+            with profiling.span('load.dates'):
+                dates = pd.to_datetime(series).to_numpy().astype('datetime64[ns]')
+            np.save(os.path.join(tmp, f'{name}.npy'), dates)
+            columns[name] = 'datetime'
+        elif name in CATEGORIES:
+            cat = series.astype('category')
+            np.save(os.path.join(tmp, f'{name}.npy'), cat.cat.codes.to_numpy())
+            with open(os.path.join(tmp, f'{name}.categories.json'), 'w', encoding='utf-8') as f:
+                json.dump([str(c) for c in cat.cat.categories], f, ensure_ascii=False)
+            columns[name] = 'category'
+        elif name in INTEGERS:
+            np.save(os.path.join(tmp, f'{name}.npy'), _narrow_int(series.to_numpy()))
+            columns[name] = 'number'
+        else:
+            np.save(os.path.join(tmp, f'{name}.npy'), series.to_numpy())
+            columns[name] = 'number'
+
+    manifest = {'version': CACHE_VERSION, 'source': source_info(source, with_hash=True),
+                'columns': columns}
+    with open(os.path.join(tmp, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    return manifest
+
+
+# ----- Lecture du cache -----
+def _read_manifest(data_dir, table, check_hash):
+    source = os.path.join(data_dir, f'{table}.csv')
+    try:
+        with open(os.path.join(cache_dir(data_dir, table), 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != CACHE_VERSION:
+        return None
+    # Invalidation si la taille, la date de modification (ou le hash) du CSV ont changé
+    current = source_info(source, with_hash=check_hash)
+    cached = manifest['source']
+    if current['size'] != cached['size']:
+        return None
+    if check_hash:
+        # Le hash fait foi : un CSV re-téléchargé à l'identique garde son cache
+        return manifest if current['sha1'] == cached.get('sha1') else None
+    return manifest if current['mtime'] == cached['mtime'] else None
+
+
+def _read_cache(data_dir, table, manifest):
+    target = cache_dir(data_dir, table)
+    data = {}
+    for name, kind in manifest['columns'].items():
+        values = np.load(os.path.join(target, f'{name}.npy'), mmap_mode='r', allow_pickle=False)
+        if kind == 'category':
+            with open(os.path.join(target, f'{name}.categories.json'), encoding='utf-8') as f:
+                categories = json.load(f)
+            data[name] = pd.Categorical.from_codes(values, categories=categories)
+        else:
+            data[name] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def load_table(data_dir, table, check_hash=False):
+    if not os.path.exists(os.path.join(data_dir, f'{table}.csv')):
+        raise FileNotFoundError(os.path.join(data_dir, f'{table}.csv'))
+    manifest = _read_manifest(data_dir, table, check_hash)
+    if manifest is None:
+        try:
+            manifest = build_cache(data_dir, table)
+        except OSError as e:
+            # Dossier en lecture seule : on se contente du CSV
+            print(f"Cache indisponible pour {table} : {e}")
+            with profiling.span('load.csv'):
+                df = pd.read_csv(os.path.join(data_dir, f'{table}.csv'),
+                                 usecols=lambda c: c in set(COLUMNS[table]))
+            profiling.count('rows.csv', len(df))
+            with profiling.span('load.dates'):
+                for name in DATES & set(df.columns):
+                    df[name] = pd.to_datetime(df[name])
+            return df
+    with profiling.span('load.cache'):
+        return _read_cache(data_dir, table, manifest)
+
+
+def load_tables(data_dir, check_hash=False):
+    return {table: load_table(data_dir, table, check_hash) for table in COLUMNS}
+
+
+# ----- Index dérivés : tableaux relus en mémoire mappée (pages partagées entre processus) -----
+def save_arrays(directory, arrays, source):
+    tmp = directory + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, values in arrays.items():
+        np.save(os.path.join(tmp, f'{name}.npy'), np.asarray(values), allow_pickle=False)
+    with open(os.path.join(tmp, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'source': source, 'arrays': list(arrays)}, f)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp, directory)
+
+
+def load_arrays(directory, source):
+    # None si absents ou calculés à partir d'un autre games.csv (source_key)
+    try:
+        with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != CACHE_VERSION or manifest['source'] != source:
+            return None
+        return {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r', allow_pickle=False)
+                for name in manifest['arrays']}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+# ----- Mesure chargement à froid / à chaud -----
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(data_dir):
+    start = time.perf_counter()
+    tables = load_tables(data_dir)
+    elapsed = time.perf_counter() - start
+    rows = {table: len(df) for table, df in tables.items()}
+    print(json.dumps({'seconds': elapsed, 'rss_mb': rss_mb(), 'rows': rows}))
+
+
+def report(data_dir):
+    # Chaque mesure dans un processus neuf pour ne pas fausser la mémoire résidente
+    def run():
+        out = subprocess.run([sys.executable, __file__, '--measure', data_dir],
+                             check=True, capture_output=True, text=True).stdout
+        return json.loads(out.strip().splitlines()[-1])
+
+    shutil.rmtree(os.path.join(data_dir, '.cache'), ignore_errors=True)
+    cold = run()
+    warm = run()
+    print(f"Lignes : {cold['rows']}")
+    print(f"Chargement à froid (CSV + cache) : {cold['seconds']:.2f} s, RSS {cold['rss_mb']:.0f} Mo")
+    print(f"Chargement à chaud (cache mappé) : {warm['seconds']:.2f} s, RSS {warm['rss_mb']:.0f} Mo")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == '--measure':
+        _measure(sys.argv[2])
+    elif len(sys.argv) == 2:
+        report(sys.argv[1])
+    else:
+        print("Usage : python data_cache.py <dossier_du_dataset>")
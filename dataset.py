@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# Localisation (dossier local ou téléchargement Kaggle) et chargement complet du jeu de données.
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import profiling
+from club_index import ClubIndex
+from data_cache import load_tables, source_key
+from elo import EloRatings
+from goal_model import GoalModel
+from pair_index import PairIndex
+import player_stats
+from player_stats import PlayerStats
+from rolling import ClubSeries
+from search import ClubSearchIndex
+
+KAGGLE_DATASET = "davidcariboo/player-scores"
+# Dossier local contenant clubs.csv, games.csv, players.csv (machines hors ligne)
+DATA_DIR_ENV = "FOOTBALL_DATA_DIR"
+RECENT_YEARS = 5
+
+
+@dataclass
+class Dataset:
+    data_dir: str
+    clubs: pd.DataFrame
+    games: pd.DataFrame
+    players: pd.DataFrame
+    cutoff_date: datetime
+    club_index: ClubIndex
+    pair_index: PairIndex
+    club_series: ClubSeries
+    ratings: EloRatings
+    goal_model: GoalModel
+    player_stats: PlayerStats
+    search_index: ClubSearchIndex
+
+
+def resolve_data_dir(data_dir=None, progress=print):
+    data_dir = data_dir or os.environ.get(DATA_DIR_ENV)
+    if data_dir:
+        return data_dir
+
+    # Import tardif : kagglehub n'est nécessaire que pour le téléchargement
+    import kagglehub
+
+    progress("Authentification Kaggle...")
+    kagglehub.login()
+    progress("Téléchargement du jeu de données...")
+    local_path = kagglehub.dataset_download(KAGGLE_DATASET, force_download=False)
+    print("Jeu de données téléchargé dans :", local_path)
+    return local_path
+
+
+def load_dataset(data_dir=None, progress=print):
+    data_dir = resolve_data_dir(data_dir, progress)
+
+    progress("Lecture des fichiers CSV...")
+    with profiling.span('load.tables'):
+        tables = load_tables(data_dir)
+    games = tables['games']
+
+    current_date = datetime.now()
+    cutoff_date = current_date - timedelta(days=RECENT_YEARS*365)  # Approximativement 5 ans
+    print(f"Date actuelle : {current_date.strftime('%Y-%m-%d')}")
+    print(f"Date de coupure (5 ans avant) : {cutoff_date.strftime('%Y-%m-%d')}")
+    print(f"Matchs totaux : {len(games)}")
+    print(f"Matchs filtrés (5 dernières années) : {int((games['date'] >= cutoff_date).sum())}")
+
+    progress("Construction des index...")
+    # Fichiers dérivés de games.csv (index, Elo, modèle) : recalculés dès que sa taille ou sa date changent
+    source = source_key(data_dir, 'games')
+    # Agrégats par club calculés une seule fois (ou relus depuis le disque)
+    with profiling.span('index.clubs'):
+        club_index = ClubIndex.load_or_build(os.path.join(data_dir, 'club_index.pkl'), games, source)
+    with profiling.span('index.pairs'):
+        pair_index = PairIndex(games)
+    with profiling.span('index.series'):
+        club_series = ClubSeries(games)
+    progress("Calcul du classement Elo...")
+    with profiling.span('index.elo'):
+        ratings = EloRatings.load_or_build(os.path.join(data_dir, 'elo.pkl'), games, source)
+    progress("Ajustement du modèle de buts...")
+    with profiling.span('index.goal_model'):
+        goal_model = GoalModel.load_or_fit(os.path.join(data_dir, 'goal_model.npz'), games, source)
+    # Fichiers optionnels (appearances, player_valuations, game_events) lus par blocs
+    with profiling.span('index.player_stats'):
+        squad_stats = player_stats.load_or_build(data_dir, progress=progress)
+    with profiling.span('index.search'):
+        search_index = ClubSearchIndex(tables['clubs']['name'].tolist())
+
+    return Dataset(data_dir=data_dir, clubs=tables['clubs'], games=games, players=tables['players'],
+                   cutoff_date=cutoff_date, club_index=club_index, pair_index=pair_index,
+                   club_series=club_series, ratings=ratings, goal_model=goal_model,
+                   player_stats=squad_stats, search_index=search_index)
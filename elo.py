@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# Classement Elo de tous les clubs : un seul passage chronologique, mises à jour vectorisées par date.
+import hashlib
+import pickle
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 65.0
+
+
+@dataclass(frozen=True)
+class EloPrediction:
+    rating1: float
+    rating2: float
+    win1: float
+    draw: float
+    win2: float
+
+
+def _goal_multiplier(diff):
+    # Pondération par l'écart de buts (World Football Elo)
+    diff = np.abs(diff)
+    return np.where(diff <= 1, 1.0, np.where(diff == 2, 1.5, (11.0 + diff) / 8.0))
+
+
+class EloRatings:
+    def __init__(self, k_factor=K_FACTOR, home_advantage=HOME_ADVANTAGE, initial_rating=INITIAL_RATING):
+        self.k_factor = k_factor
+        self.home_advantage = home_advantage
+        self.initial_rating = initial_rating
+        self.ratings = np.empty(0)
+        self._index = {}
+        self.last_date = None
+        self.games_applied = 0
+        # data_cache.source_key de games.csv et empreinte des matchs déjà appliqués
+        self.source = None
+        self.applied_digest = None
+        self._results = np.zeros(3, dtype=np.int64)  # victoires domicile, nuls, victoires extérieur
+        # Historique : nouvelle note de chaque club après chaque date où il a joué
+        self._log_dates = []
+        self._log_clubs = []
+        self._log_ratings = []
+        self._history = None
+
+    @classmethod
+    def build(cls, games, **kwargs):
+        ratings = cls(**kwargs)
+        ratings.update(games)
+        return ratings
+
+    # ----- Persistance -----
+    @staticmethod
+    def _digest(games, until):
+        # Empreinte des matchs joués jusqu'à `until` (dates, clubs, scores), dans l'ordre du fichier
+        dates = games['date'].to_numpy().astype('datetime64[ns]')
+        home_goals = games['home_club_goals'].to_numpy(dtype=np.float64)
+        away_goals = games['away_club_goals'].to_numpy(dtype=np.float64)
+        mask = ~(np.isnan(home_goals) | np.isnan(away_goals)) & (dates <= until)
+        digest = hashlib.sha1()
+        for values in (dates.view(np.int64), games['home_club_id'].to_numpy(dtype=np.int64),
+                       games['away_club_id'].to_numpy(dtype=np.int64), home_goals, away_goals):
+            digest.update(np.ascontiguousarray(values[mask]).tobytes())
+        return digest.hexdigest()
+
+    def _matches_history(self, games):
+        # games.csv a changé : les matchs déjà appliqués doivent être exactement ceux du fichier jusqu'à last_date
+        # (score corrigé, match supprimé ou inséré avant last_date -> recalcul complet)
+        if self.last_date is None:
+            return True
+        return self._digest(games, self.last_date) == self.applied_digest
+
+    def save(self, path):
+        self._history_arrays()
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+
+    @classmethod
+    def load_or_build(cls, path, games, source):
+        try:
+            with open(path, 'rb') as f:
+                ratings = pickle.load(f)
+            # Même clé que les autres fichiers dérivés : fichier inchangé, classement réutilisé tel quel
+            if ratings.source == source:
+                return ratings
+            if not ratings._matches_history(games):
+                ratings = None
+        except (OSError, EOFError, AttributeError, pickle.UnpicklingError):
+            ratings = None
+        if ratings is None:
+            ratings = cls()
+        # Seuls les nouveaux matchs sont appliqués (ajouts au fichier)
+        ratings.update(games)
+        ratings.source = source
+        ratings.applied_digest = None if ratings.last_date is None else cls._digest(games, ratings.last_date)
+        try:
+            ratings.save(path)
+        except OSError as e:
+            print(f"Impossible d'enregistrer le classement Elo : {e}")
+        return ratings
+
+    def _club_indices(self, club_ids):
+        new_ids = [club_id for club_id in pd.unique(club_ids).tolist() if club_id not in self._index]
+        for club_id in new_ids:
+            self._index[club_id] = len(self._index)
+        if new_ids:
+            self.ratings = np.append(self.ratings, np.full(len(new_ids), self.initial_rating))
+        known = np.fromiter(self._index.keys(), dtype=np.int64, count=len(self._index))
+        positions = np.fromiter(self._index.values(), dtype=np.int64, count=len(self._index))
+        sorter = np.argsort(known)
+        return positions[sorter[np.searchsorted(known, club_ids, sorter=sorter)]]
+
+    def update(self, games):
+        # N'applique que les matchs postérieurs au dernier déjà traité (ajouts au fichier)
+        dates = games['date'].to_numpy().astype('datetime64[ns]')
+        home_goals = games['home_club_goals'].to_numpy(dtype=np.float64)
+        away_goals = games['away_club_goals'].to_numpy(dtype=np.float64)
+        mask = ~(np.isnan(home_goals) | np.isnan(away_goals))
+        if self.last_date is not None:
+            mask &= dates > self.last_date
+        if not mask.any():
+            return 0
+
+        order = np.argsort(dates[mask], kind='stable')
+        dates = dates[mask][order]
+        home = self._club_indices(games['home_club_id'].to_numpy(dtype=np.int64)[mask][order])
+        away = self._club_indices(games['away_club_id'].to_numpy(dtype=np.int64)[mask][order])
+        diff = (home_goals[mask] - away_goals[mask])[order]
+        score = np.where(diff > 0, 1.0, np.where(diff < 0, 0.0, 0.5))
+        multiplier = _goal_multiplier(diff)
+        self._results += [np.count_nonzero(diff > 0), np.count_nonzero(diff == 0), np.count_nonzero(diff < 0)]
+
+        # Un club joue au plus une fois par date : tous les matchs d'une même date sont mis à jour ensemble
+        _, starts = np.unique(dates, return_index=True)
+        stops = np.append(starts[1:], len(dates))
+        for start, stop in zip(starts, stops):
+            h, a = home[start:stop], away[start:stop]
+            expected = 1.0 / (1.0 + 10.0 ** ((self.ratings[a] - self.ratings[h] - self.home_advantage) / 400.0))
+            delta = self.k_factor * multiplier[start:stop] * (score[start:stop] - expected)
+            np.add.at(self.ratings, h, delta)
+            np.add.at(self.ratings, a, -delta)
+            clubs = np.concatenate([h, a])
+            self._log_dates.append(np.full(len(clubs), dates[start]))
+            self._log_clubs.append(clubs)
+            self._log_ratings.append(self.ratings[clubs])
+
+        self.last_date = dates[-1]
+        self.games_applied += len(dates)
+        self._history = None
+        return len(dates)
+
+    # ----- Consultation -----
+    def rating(self, club_id):
+        i = self._index.get(int(club_id))
+        return self.initial_rating if i is None else float(self.ratings[i])
+
+    def _history_arrays(self):
+        if self._history is None:
+            clubs = np.concatenate(self._log_clubs) if self._log_clubs else np.empty(0, dtype=np.int64)
+            dates = np.concatenate(self._log_dates) if self._log_dates else np.empty(0, dtype='datetime64[ns]')
+            ratings = np.concatenate(self._log_ratings) if self._log_ratings else np.empty(0)
+            order = np.lexsort((dates, clubs))
+            clubs, dates, ratings = clubs[order], dates[order], ratings[order]
+            bounds = np.searchsorted(clubs, np.arange(len(self._index) + 1))
+            self._history = (dates, ratings, bounds)
+            self._log_dates, self._log_clubs, self._log_ratings = [dates], [clubs], [ratings]
+        return self._history
+
+    def history(self, club_id):
+        i = self._index.get(int(club_id))
+        if i is None:
+            return pd.DataFrame({'date': pd.Series(dtype='datetime64[ns]'), 'rating': pd.Series(dtype=float)})
+        dates, ratings, bounds = self._history_arrays()
+        return pd.DataFrame({'date': dates[bounds[i]:bounds[i + 1]], 'rating': ratings[bounds[i]:bounds[i + 1]]})
+
+    def rating_at(self, club_id, date):
+        # Note du club à l'issue de la journée `date`
+        i = self._index.get(int(club_id))
+        if i is None:
+            return self.initial_rating
+        dates, ratings, bounds = self._history_arrays()
+        club_dates = dates[bounds[i]:bounds[i + 1]]
+        pos = int(np.searchsorted(club_dates, np.datetime64(pd.Timestamp(date).to_datetime64(), 'ns'), side='right'))
+        return self.initial_rating if pos == 0 else float(ratings[bounds[i] + pos - 1])
+
+    def draw_factor(self):
+        # Modèle de Davidson : pour deux équipes égales P(nul) = nu / (2 + nu), calé sur la fréquence des nuls
+        total = self._results.sum()
+        draw_rate = float(self._results[1] / total) if total > 0 else 0.25
+        return 2.0 * draw_rate / (1.0 - draw_rate)
+
+    def predict(self, club1_id, club2_id, club1_home=None):
+        # club1_home : True / False pour appliquer l'avantage du terrain, None pour un terrain neutre
+        rating1, rating2 = self.rating(club1_id), self.rating(club2_id)
+        diff = rating1 - rating2
+        if club1_home is not None:
+            diff += self.home_advantage if club1_home else -self.home_advantage
+        strength1, strength2 = 10.0 ** (diff / 800.0), 10.0 ** (-diff / 800.0)
+        draw = self.draw_factor()
+        total = strength1 + strength2 + draw
+        return EloPrediction(rating1=rating1, rating2=rating2, win1=strength1 / total,
+                             draw=draw / total, win2=strength2 / total)
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# Modèle de buts de Poisson (attaque / défense par club + avantage du terrain), ajusté une fois pour tous les clubs.
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import minimize
+from scipy.stats import poisson
+
+MAX_GOALS = 10
+# Pondération temporelle à la Dixon-Coles : un match d'il y a HALF_LIFE_DAYS jours compte moitié moins
+HALF_LIFE_DAYS = 730
+RIDGE = 1.0
+MODEL_VERSION = 1
+
+
+@dataclass(frozen=True)
+class GoalPrediction:
+    expected1: float
+    expected2: float
+    win1: float
+    draw: float
+    win2: float
+    scores: np.ndarray  # scores[i, j] = P(club1 marque i, club2 marque j)
+
+    def top_scores(self, n=5):
+        flat = np.argsort(self.scores, axis=None)[::-1][:n]
+        return [(int(i), int(j), float(self.scores[i, j]))
+                for i, j in zip(*np.unravel_index(flat, self.scores.shape))]
+
+
+def design_matrix(home, away, n_clubs):
+    # Colonnes : [intercept, domicile, attaque(n_clubs), défense(n_clubs)]
+    # Une ligne par (match, équipe qui marque) : buts domicile puis buts extérieur
+    n = len(home)
+    rows = np.repeat(np.arange(2 * n), 4)
+    attack, defence = 2, 2 + n_clubs
+    scorer = np.concatenate([home, away])
+    conceder = np.concatenate([away, home])
+    cols = np.column_stack([
+        np.zeros(2 * n, dtype=np.int64),
+        np.ones(2 * n, dtype=np.int64),
+        attack + scorer,
+        defence + conceder,
+    ]).ravel()
+    values = np.column_stack([
+        np.ones(2 * n),
+        np.concatenate([np.ones(n), np.zeros(n)]),
+        np.ones(2 * n),
+        -np.ones(2 * n),
+    ]).ravel()
+    return sparse.csr_matrix((values, (rows, cols)), shape=(2 * n, 2 + 2 * n_clubs))
+
+
+class GoalModel:
+    def __init__(self, club_ids, params):
+        self.club_ids = np.asarray(club_ids, dtype=np.int64)
+        self.params = np.asarray(params, dtype=np.float64)
+        self._index = {club_id: i for i, club_id in enumerate(self.club_ids.tolist())}
+        n = len(self.club_ids)
+        self.intercept, self.home_advantage = self.params[0], self.params[1]
+        self.attack = self.params[2:2 + n]
+        self.defence = self.params[2 + n:]
+
+    @classmethod
+    def fit(cls, games, half_life_days=HALF_LIFE_DAYS, ridge=RIDGE):
+        home_goals = games['home_club_goals'].to_numpy(dtype=np.float64)
+        away_goals = games['away_club_goals'].to_numpy(dtype=np.float64)
+        played = ~(np.isnan(home_goals) | np.isnan(away_goals))
+        home_ids = games['home_club_id'].to_numpy(dtype=np.int64)[played]
+        away_ids = games['away_club_id'].to_numpy(dtype=np.int64)[played]
+        club_ids, inverse = np.unique(np.concatenate([home_ids, away_ids]), return_inverse=True)
+        home, away = np.split(inverse, 2)
+        n_clubs = len(club_ids)
+
+        X = design_matrix(home, away, n_clubs)
+        y = np.concatenate([home_goals[played], away_goals[played]])
+        dates = games['date'].to_numpy().astype('datetime64[D]')[played]
+        if half_life_days:
+            age = (dates.max() - dates).astype(np.float64)
+            weights = np.tile(0.5 ** (age / half_life_days), 2)
+        else:
+            weights = np.ones(len(y))
+        # Pénalité L2 sur attaque / défense seulement (identifiabilité)
+        penalty = np.concatenate([[0.0, 0.0], np.full(2 * n_clubs, ridge)])
+
+        def objective(beta):
+            eta = X @ beta
+            rate = np.exp(eta)
+            # Log-vraisemblance de Poisson (sans le terme constant log(y!)), vectorisée sur tous les matchs
+            nll = np.dot(weights, rate - y * eta) + 0.5 * np.dot(penalty, beta * beta)
+            grad = X.T @ (weights * (rate - y)) + penalty * beta
+            return nll, grad
+
+        beta0 = np.zeros(X.shape[1])
+        beta0[0] = np.log(max(np.average(y, weights=weights), 1e-6))
+        result = minimize(objective, beta0, jac=True, method='L-BFGS-B', options={'maxiter': 500})
+        return cls(club_ids, result.x)
+
+    # ----- Persistance -----
+    def save(self, path, source):
+        # source : data_cache.source_key de games.csv (taille, date de modification)
+        with open(path, 'wb') as f:
+            np.savez(f, version=MODEL_VERSION, club_ids=self.club_ids, params=self.params,
+                     source=np.array([source['size'], source['mtime']], dtype=np.int64))
+
+    @classmethod
+    def load_or_fit(cls, path, games, source):
+        try:
+            with np.load(path) as data:
+                if (int(data['version']) == MODEL_VERSION
+                        and np.array_equal(data['source'], [source['size'], source['mtime']])):
+                    return cls(data['club_ids'], data['params'])
+        except (OSError, KeyError, ValueError):
+            pass
+        model = cls.fit(games)
+        try:
+            model.save(path, source)
+        except OSError as e:
+            print(f"Impossible d'enregistrer le modèle de buts : {e}")
+        return model
+
+    # ----- Prédiction -----
+    def _strength(self, club_id):
+        i = self._index.get(int(club_id))
+        return (0.0, 0.0) if i is None else (self.attack[i], self.defence[i])
+
+    def expected_goals(self, club1_id, club2_id, club1_home=None):
+        # club1_home : True / False, ou None pour un terrain neutre (moitié de l'avantage pour chacun)
+        attack1, defence1 = self._strength(club1_id)
+        attack2, defence2 = self._strength(club2_id)
+        if club1_home is None:
+            home1 = home2 = self.home_advantage / 2
+        else:
+            home1 = self.home_advantage if club1_home else 0.0
+            home2 = 0.0 if club1_home else self.home_advantage
+        return (float(np.exp(self.intercept + home1 + attack1 - defence2)),
+                float(np.exp(self.intercept + home2 + attack2 - defence1)))
+
+    def predict(self, club1_id, club2_id, club1_home=None, max_goals=MAX_GOALS):
+        expected1, expected2 = self.expected_goals(club1_id, club2_id, club1_home)
+        goals = np.arange(max_goals + 1)
+        scores = np.outer(poisson.pmf(goals, expected1), poisson.pmf(goals, expected2))
+        scores /= scores.sum()
+        return GoalPrediction(expected1=expected1, expected2=expected2,
+                              win1=float(np.tril(scores, -1).sum()), draw=float(np.trace(scores)),
+                              win2=float(np.triu(scores, 1).sum()), scores=scores)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Index des matchs par paire de clubs (id min, id max), triés par paire puis par date.
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import profiling
+from data_cache import load_arrays, save_arrays
+from rolling import to_datetime64
+from stats import HeadToHeadStats
+
+
+def pair_key(club1_id, club2_id):
+    lo, hi = min(club1_id, club2_id), max(club1_id, club2_id)
+    return (np.int64(lo) << 32) | np.int64(hi)
+
+
+class PairIndex:
+    ARRAYS = ('keys', 'dates', 'home_ids', 'away_ids', 'home_goals', 'away_goals', 'cum')
+
+    def __init__(self, games):
+        home_ids = games['home_club_id'].to_numpy(dtype=np.int64)
+        away_ids = games['away_club_id'].to_numpy(dtype=np.int64)
+        dates = games['date'].to_numpy().astype('datetime64[ns]')
+        keys = (np.minimum(home_ids, away_ids) << 32) | np.maximum(home_ids, away_ids)
+
+        # Tri par paire puis par date : les matchs d'une paire forment une tranche contiguë
+        order = np.lexsort((dates, keys))
+        self.keys = keys[order]
+        self.dates = dates[order]
+        self.home_ids = home_ids[order]
+        self.away_ids = away_ids[order]
+        self.home_goals = games['home_club_goals'].to_numpy()[order]
+        self.away_goals = games['away_club_goals'].to_numpy()[order]
+
+        # Sommes cumulées du point de vue du plus petit id de la paire ("low") et du plus grand ("high")
+        low_home = self.home_ids < self.away_ids
+        home_goals = self.home_goals.astype(np.float64)
+        away_goals = self.away_goals.astype(np.float64)
+        low_goals = np.where(low_home, home_goals, away_goals)
+        high_goals = np.where(low_home, away_goals, home_goals)
+        values = np.column_stack([
+            np.ones(len(order), dtype=np.int64),
+            low_goals > high_goals,
+            low_goals < high_goals,
+            np.nan_to_num(low_goals),
+            np.nan_to_num(high_goals),
+        ]).astype(np.int64)
+        self.cum = np.vstack([np.zeros((1, values.shape[1]), dtype=np.int64), values.cumsum(axis=0)])
+
+    def __len__(self):
+        return len(self.keys)
+
+    # ----- Persistance (tableaux .npy mappés en mémoire) -----
+    def save(self, directory, source):
+        save_arrays(directory, {name: getattr(self, name) for name in self.ARRAYS}, source)
+
+    @classmethod
+    def load_or_build(cls, directory, games, source):
+        arrays = load_arrays(directory, source)
+        if arrays is not None:
+            index = cls.__new__(cls)
+            for name in cls.ARRAYS:
+                setattr(index, name, arrays[name])
+            return index
+        index = cls(games)
+        try:
+            index.save(directory, source)
+        except OSError as e:
+            print(f"Impossible d'enregistrer l'index des confrontations : {e}")
+        return index
+
+    def slice(self, club1_id, club2_id, window=None):
+        # Recherche dichotomique de la paire, puis de la fenêtre de dates à l'intérieur
+        key = pair_key(club1_id, club2_id)
+        start = int(np.searchsorted(self.keys, key, side='left'))
+        stop = int(np.searchsorted(self.keys, key, side='right'))
+        if window is not None:
+            lo, hi = window.bounds(self.dates[start:stop])
+            start, stop = start + lo, start + hi
+        return slice(start, stop)
+
+    def head_to_head(self, club1_id, club2_id, window=None):
+        s = self.slice(club1_id, club2_id, window)
+        profiling.count('rows.h2h', s.stop - s.start)
+        matches, low_wins, high_wins, low_goals, high_goals = (self.cum[s.stop] - self.cum[s.start]).tolist()
+        if club1_id > club2_id:
+            low_wins, high_wins, low_goals, high_goals = high_wins, low_wins, high_goals, low_goals
+        return HeadToHeadStats(matches=matches, wins1=low_wins, wins2=high_wins,
+                               draws=matches - low_wins - high_wins, goals1=low_goals, goals2=high_goals)
+
+    def games(self, club1_id, club2_id, window=None):
+        s = self.slice(club1_id, club2_id, window)
+        return pd.DataFrame({
+            'date': self.dates[s],
+            'home_club_id': self.home_ids[s],
+            'away_club_id': self.away_ids[s],
+            'home_club_goals': self.home_goals[s],
+            'away_club_goals': self.away_goals[s],
+        })
+
+    # ----- Export de toutes les confrontations -----
+    def matrix(self, window=None):
+        # Matrices creuses club x club : wins[i, j] = victoires de i contre j,
+        # draws[i, j] = nuls entre i et j (symétrique), goals[i, j] = buts de i contre j
+        mask = np.ones(len(self), dtype=bool)
+        if window is not None and window.since is not None:
+            mask &= self.dates >= to_datetime64(window.since)
+        if window is not None and window.until is not None:
+            mask &= self.dates <= to_datetime64(window.until)
+
+        club_ids, inverse = np.unique(np.concatenate([self.home_ids[mask], self.away_ids[mask]]),
+                                      return_inverse=True)
+        home, away = np.split(inverse, 2)
+        home_goals = self.home_goals[mask]
+        away_goals = self.away_goals[mask]
+        home_win = home_goals > away_goals
+        away_win = home_goals < away_goals
+        draw = ~(home_win | away_win)
+        n = len(club_ids)
+
+        def build(rows, cols, values):
+            matrix = sparse.coo_matrix((values, (rows, cols)), shape=(n, n)).tocsr()
+            matrix.eliminate_zeros()
+            return matrix
+
+        rows = np.concatenate([home, away])
+        cols = np.concatenate([away, home])
+        return {
+            'club_ids': club_ids,
+            'matches': build(rows, cols, np.ones(len(rows), dtype=np.int64)),
+            'wins': build(rows, cols, np.concatenate([home_win, away_win]).astype(np.int64)),
+            'draws': build(rows, cols, np.concatenate([draw, draw]).astype(np.int64)),
+            'goals': build(rows, cols, np.nan_to_num(np.concatenate([home_goals, away_goals])).astype(np.int64)),
+        }
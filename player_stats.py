@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# Agrégats par club et par saison (apparitions, valeurs marchandes, événements de match),
+# calculés en lisant les gros CSV par blocs. Apparitions et événements : cumul d'une ligne par (club, saison) ;
+# valeurs marchandes : une ligne par (club, saison, joueur), la dernière valeur connue.
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_cache import source_key
+
+CHUNK_SIZE = 500_000
+AGGREGATES_VERSION = 2
+
+# Colonnes lues et types réduits pour chaque fichier
+SOURCES = {
+    'appearances': {
+        'player_id': 'Int32', 'player_club_id': 'Int32', 'date': 'str',
+        'yellow_cards': 'Int8', 'red_cards': 'Int8', 'goals': 'Int8', 'assists': 'Int8', 'minutes_played': 'Int16',
+    },
+    'player_valuations': {
+        'player_id': 'Int32', 'current_club_id': 'Int32', 'date': 'str', 'market_value_in_eur': 'float64',
+    },
+    'game_events': {
+        'club_id': 'Int32', 'date': 'str', 'type': 'category',
+    },
+}
+
+
+def season_of(dates):
+    # Saison européenne : une saison "2023" va de juillet 2023 à juin 2024
+    dates = pd.to_datetime(dates)
+    return (dates.dt.year - (dates.dt.month < 7)).astype('int16')
+
+
+def _read_chunks(path, columns, chunksize):
+    return pd.read_csv(path, usecols=list(columns), dtype={c: t for c, t in columns.items() if t != 'str'},
+                       chunksize=chunksize)
+
+
+def _fold(total, part, keys):
+    # Fusionne le résultat d'un bloc avec le cumul courant
+    if total is None:
+        return part
+    return pd.concat([total, part]).groupby(level=keys).sum()
+
+
+# ----- Agrégations par fichier -----
+def aggregate_appearances(path, chunksize=CHUNK_SIZE):
+    total = None
+    for chunk in _read_chunks(path, SOURCES['appearances'], chunksize):
+        counts = ['goals', 'assists', 'minutes_played', 'yellow_cards', 'red_cards']
+        # Types réduits à la lecture, mais sommes en int64 pour éviter les dépassements
+        chunk = chunk.assign(season=season_of(chunk['date']), appearances=1,
+                             **{c: chunk[c].fillna(0).astype('int64') for c in counts})
+        part = chunk.groupby(['player_club_id', 'season'])[['appearances'] + counts].sum()
+        total = _fold(total, part, ['player_club_id', 'season'])
+    return total.rename_axis(['club_id', 'season'])
+
+
+def _merge_latest(latest, part):
+    # Une ligne par clé de chaque côté : la plus récente l'emporte, à date égale celle du bloc suivant (plus loin
+    # dans le fichier). Recherche par clé, sans retrier le cumul
+    if latest is None:
+        return part
+    previous = latest.reindex(part.index)
+    newer = ~(previous['date'] > part['date'])
+    return pd.concat([latest[~latest.index.isin(part.index[newer])], part[newer]])
+
+
+def aggregate_valuations(path, chunksize=CHUNK_SIZE):
+    # Valeur de l'effectif = somme, pour chaque joueur, de sa dernière valeur connue dans la saison
+    keys = ['current_club_id', 'season', 'player_id']
+    latest = None
+    for chunk in _read_chunks(path, SOURCES['player_valuations'], chunksize):
+        chunk = chunk.dropna(subset=['market_value_in_eur'])
+        chunk = chunk.assign(date=pd.to_datetime(chunk['date']), season=season_of(chunk['date']))
+        # Dernière valeur de chaque joueur dans le bloc ; tri stable : à date égale, l'ordre du fichier
+        part = chunk.sort_values('date', kind='stable').groupby(keys)[['date', 'market_value_in_eur']].last()
+        latest = _merge_latest(latest, part)
+    latest = latest.sort_index().reset_index()
+    table = latest.groupby(['current_club_id', 'season']).agg(
+        squad_value=('market_value_in_eur', 'sum'),
+        valued_players=('player_id', 'size'),
+        max_value=('market_value_in_eur', 'max'),
+    )
+    return table.rename_axis(['club_id', 'season'])
+
+
+def aggregate_events(path, chunksize=CHUNK_SIZE):
+    total = None
+    for chunk in _read_chunks(path, SOURCES['game_events'], chunksize):
+        chunk = chunk.assign(season=season_of(chunk['date']))
+        part = chunk.groupby(['club_id', 'season', 'type'], observed=True).size().unstack('type', fill_value=0)
+        total = _fold(total, part, ['club_id', 'season'])
+    total = total.fillna(0).astype('int64')
+    total.columns = [f'events_{str(c).lower()}' for c in total.columns]
+    return total
+
+
+AGGREGATORS = {
+    'appearances': aggregate_appearances,
+    'player_valuations': aggregate_valuations,
+    'game_events': aggregate_events,
+}
+
+
+# ----- Persistance à côté du jeu de données -----
+def _aggregate_path(data_dir, name):
+    return os.path.join(data_dir, 'aggregates', f'{name}.pkl')
+
+
+def load_or_build(data_dir, chunksize=CHUNK_SIZE, progress=print):
+    tables = {}
+    for name, aggregate in AGGREGATORS.items():
+        source = os.path.join(data_dir, f'{name}.csv')
+        if not os.path.exists(source):
+            continue
+        info = source_key(data_dir, name)
+        path = _aggregate_path(data_dir, name)
+        try:
+            saved = pd.read_pickle(path)
+            if saved['version'] == AGGREGATES_VERSION and saved['source'] == info:
+                tables[name] = saved['table']
+                continue
+        except (OSError, EOFError, KeyError, TypeError, ValueError):
+            pass
+        progress(f"Agrégation de {name}.csv...")
+        tables[name] = aggregate(source, chunksize)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            pd.to_pickle({'version': AGGREGATES_VERSION, 'source': info, 'table': tables[name]}, path)
+        except OSError as e:
+            print(f"Impossible d'enregistrer les agrégats {name} : {e}")
+    return PlayerStats(tables)
+
+
+class PlayerStats:
+    def __init__(self, tables):
+        self.tables = tables
+        frames = list(tables.values())
+        # Une ligne par (club_id, season), toutes sources confondues
+        self.table = pd.concat(frames, axis=1).sort_index() if frames else pd.DataFrame(
+            index=pd.MultiIndex.from_arrays([[], []], names=['club_id', 'season']))
+
+    def __bool__(self):
+        return not self.table.empty
+
+    def club(self, club_id):
+        try:
+            return self.table.xs(int(club_id), level='club_id')
+        except KeyError:
+            return self.table.iloc[0:0].droplevel('club_id')
+
+    def latest_season(self, club_id):
+        seasons = self.club(club_id)
+        if 'appearances' in seasons:
+            seasons = seasons[seasons['appearances'].fillna(0) > 0]
+        return None if seasons.empty else seasons.iloc[-1]
+
+    def value_trend(self, club_id, seasons=3):
+        club = self.club(club_id)
+        if 'squad_value' not in club:
+            return pd.Series(dtype=np.float64)
+        return club['squad_value'].dropna().iloc[-seasons:]
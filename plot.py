@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Graphique unique de la comparaison : la figure et le canevas Tk sont créés une fois puis mis à jour.
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+import profiling
+
+COLORS = ('blue', 'red', 'green')
+
+
+class _Canvas(FigureCanvasTkAgg):
+    # Le rendu a lieu plus tard (draw_idle, boucle Tk) : il est mesuré là où il se produit
+    def draw(self):
+        with profiling.span('render.draw'):
+            super().draw()
+
+
+class ComparisonPlot:
+    def __init__(self, master, row, column=0, columnspan=2):
+        self.figure = Figure(figsize=(10, 6), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        self.curves = [self.ax.plot([], [], color=color)[0] for color in COLORS]
+        self.markers = [self.ax.axvline(0, color=color, linestyle='--') for color in COLORS]
+        self.draw_marker = self.ax.axvline(0, color='black', linestyle=':')
+        self.ax.set_xlabel("Taux")
+        self.ax.set_ylabel("Densité")
+
+        self.canvas = _Canvas(self.figure, master=master)
+        self.widget = self.canvas.get_tk_widget()
+        self._grid = {'row': row, 'column': column, 'columnspan': columnspan, 'pady': 10}
+        # Placé dans la grille au premier affichage seulement
+        self.visible = False
+
+    def update(self, x, curves, marker, title):
+        # curves : une liste de (densités, moyenne, libellé) par couleur ; marker : (position, libellé)
+        for line, mean_line, (y, mean, label) in zip(self.curves, self.markers, curves):
+            line.set_data(x, y)
+            line.set_label(label)
+            mean_line.set_xdata([mean, mean])
+        self.draw_marker.set_xdata([marker[0], marker[0]])
+        self.draw_marker.set_label(marker[1])
+
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.ax.set_title(title)
+        self.ax.legend()
+
+        if not self.visible:
+            self.widget.grid(**self._grid)
+            self.visible = True
+        self.canvas.draw_idle()
+
+    def hide(self):
+        if self.visible:
+            self.widget.grid_remove()
+            self.visible = False
+
+    def destroy(self):
+        self.widget.destroy()
+        self.figure.clear()
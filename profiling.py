@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# Instrumentation des chemins chauds : intervalles nommés (chargement, dates, filtrage, statistiques, figure, dessin)
+# et compteurs de lignes. Désactivée par défaut ; activée par FOOTBALL_PROFILE ou --profile. Désactivée, chaque
+# point de mesure se réduit à un test de booléen (aucune horloge lue, rien n'est enregistré).
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+# "1" : mesures en mémoire seulement ; un chemin : export à la sortie (.trace.json = format Chrome)
+PROFILE_ENV = "FOOTBALL_PROFILE"
+CHROME_SUFFIX = ".trace.json"
+
+_enabled = False
+_lock = threading.Lock()
+_spans = []     # (nom, début ns, durée ns, thread)
+_counters = []  # (nom, instant ns, valeur, thread)
+_threads = {}
+_exports = set()
+_origin = time.perf_counter_ns()
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter_ns() - self.start
+        thread = threading.current_thread()
+        with _lock:
+            _threads[thread.ident] = thread.name
+            _spans.append((self.name, self.start, duration, thread.ident))
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enabled():
+    return _enabled
+
+
+def enable(path=None):
+    global _enabled
+    _enabled = True
+    if path and path not in _exports:
+        _exports.add(path)
+        atexit.register(export, path)
+
+
+def span(name):
+    # with profiling.span('compare.stats'): ...
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def count(name, value=1):
+    # Lignes parcourues, candidats examinés... additionnés par nom
+    if _enabled:
+        thread = threading.current_thread()
+        with _lock:
+            _threads[thread.ident] = thread.name
+            _counters.append((name, time.perf_counter_ns(), int(value), thread.ident))
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+# ----- Résumés -----
+def mark():
+    # Position courante : summary(mark) ne retient que ce qui a été mesuré depuis
+    with _lock:
+        return len(_spans), len(_counters)
+
+
+def summary(since=(0, 0)):
+    with _lock:
+        spans, counters = _spans[since[0]:], _counters[since[1]:]
+    durations = defaultdict(list)
+    for name, _, duration, _ in spans:
+        durations[name].append(duration / 1e6)
+    totals = defaultdict(int)
+    for name, _, value, _ in counters:
+        totals[name] += value
+    return {
+        'spans': {name: {'count': len(values), 'total_ms': sum(values), 'mean_ms': sum(values) / len(values),
+                         'max_ms': max(values)} for name, values in durations.items()},
+        'counters': dict(totals),
+    }
+
+
+def breakdown(since=(0, 0)):
+    # Une ligne pour la barre d'état : durée totale par intervalle, puis compteurs
+    result = summary(since)
+    parts = [f"{name} {s['total_ms']:.1f} ms" for name, s in result['spans'].items()]
+    parts += [f"{name} {value}" for name, value in result['counters'].items()]
+    return " · ".join(parts)
+
+
+# ----- Export -----
+def _chrome_trace(spans, counters, threads):
+    # Format "Trace Event" lisible par chrome://tracing et Perfetto (temps en microsecondes)
+    pid = os.getpid()
+    events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+              for tid, name in threads.items()]
+    events += [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid, 'ts': (start - _origin) / 1e3, 'dur': duration / 1e3}
+               for name, start, duration, tid in spans]
+    totals = defaultdict(int)
+    for name, at, value, tid in counters:
+        totals[name] += value
+        events.append({'name': name, 'ph': 'C', 'pid': pid, 'tid': tid, 'ts': (at - _origin) / 1e3,
+                       'args': {name: totals[name]}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def export(path):
+    with _lock:
+        spans, counters, threads = list(_spans), list(_counters), dict(_threads)
+    if path.endswith(CHROME_SUFFIX):
+        payload = _chrome_trace(spans, counters, threads)
+    else:
+        payload = dict(summary(), events=[
+            {'name': name, 'start_ms': (start - _origin) / 1e6, 'duration_ms': duration / 1e6,
+             'thread': threads.get(tid, str(tid))} for name, start, duration, tid in spans])
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False)
+    return path
+
+
+def _configure_from_env():
+    value = os.environ.get(PROFILE_ENV, '').strip()
+    if value and value.lower() not in ('0', 'false', 'no'):
+        enable(None if value.lower() in ('1', 'true', 'yes') else value)
+
+
+_configure_from_env()
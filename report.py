@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+# Comparaison complète de deux clubs (statistiques, Elo, Poisson, simulation, effectifs) sous une forme
+# sérialisable en JSON : calculée localement par l'interface ou par le serveur, puis relue par le client léger.
+import math
+from datetime import datetime
+from dataclasses import dataclass, fields, is_dataclass
+
+import numpy as np
+import pandas as pd
+
+import profiling
+import stats
+from elo import EloPrediction
+from goal_model import GoalPrediction
+from rolling import Window
+from simulation import LeagueSimulation, MatchSimulation, simulate_league, simulate_match
+
+SIMULATED_MATCHES = 100_000
+SIMULATED_SEASONS = 10_000
+SQUAD_COLUMNS = ('goals', 'assists', 'minutes_played', 'yellow_cards', 'red_cards')
+
+
+@dataclass(frozen=True)
+class ComparisonReport:
+    club1_name: str
+    club2_name: str
+    comparison: stats.Comparison
+    club1_players: int
+    club2_players: int
+    club1_market_value: float  # None si inconnue
+    club2_market_value: float
+    club1_squad_size: float
+    club2_squad_size: float
+    prediction: EloPrediction
+    goals: GoalPrediction
+    simulation: MatchSimulation
+    squads: tuple  # ((saison, évolution de la valeur) par club), None sans données de joueurs
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(club1_name=d['club1_name'], club2_name=d['club2_name'],
+                   comparison=comparison_from_dict(d['comparison']),
+                   club1_players=d['club1_players'], club2_players=d['club2_players'],
+                   club1_market_value=d['club1_market_value'], club2_market_value=d['club2_market_value'],
+                   club1_squad_size=d['club1_squad_size'], club2_squad_size=d['club2_squad_size'],
+                   prediction=EloPrediction(**d['prediction']),
+                   goals=GoalPrediction(**{**d['goals'], 'scores': np.array(d['goals']['scores'])}),
+                   simulation=MatchSimulation(**{**d['simulation'], 'scores': np.array(d['simulation']['scores'])}),
+                   squads=None if d['squads'] is None else tuple(
+                       (season, [tuple(point) for point in trend]) for season, trend in d['squads']))
+
+
+# ----- Conversion JSON -----
+def jsonable(value):
+    # Dataclasses, tableaux numpy et dates -> types JSON (NaN -> null)
+    if is_dataclass(value):
+        return {f.name: jsonable(getattr(value, f.name)) for f in fields(value)}
+    if isinstance(value, dict):
+        return {str(k): jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return jsonable(value.tolist())
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def window_from_dict(d):
+    return Window(since=pd.Timestamp(d['since']) if d['since'] else None,
+                  until=pd.Timestamp(d['until']) if d['until'] else None, label=d['label'])
+
+
+def comparison_from_dict(d):
+    return stats.Comparison(club1_id=d['club1_id'], club2_id=d['club2_id'],
+                            club1=stats.ClubStats(**d['club1']), club2=stats.ClubStats(**d['club2']),
+                            head_to_head=stats.HeadToHeadStats(**d['head_to_head']),
+                            window=window_from_dict(d['window']),
+                            club1_window=stats.ClubStats(**d['club1_window']),
+                            club2_window=stats.ClubStats(**d['club2_window']),
+                            head_to_head_window=stats.HeadToHeadStats(**d['head_to_head_window']))
+
+
+def league_from_dict(d):
+    return LeagueSimulation(n=d['n'], club_ids=tuple(d['club_ids']),
+                            expected_points=np.array(d['expected_points']),
+                            expected_goal_difference=np.array(d['expected_goal_difference']),
+                            positions=np.array(d['positions']))
+
+
+# ----- Calcul -----
+def club_id(clubs, name):
+    ids = clubs.loc[clubs['name'] == name, 'club_id']
+    if ids.empty:
+        raise KeyError(f"Club introuvable : {name}")
+    return int(ids.iloc[0])
+
+
+def _value(value):
+    # Valeur brute du CSV en type Python natif (None si manquante)
+    if pd.isna(value):
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _squad(player_stats, club_id):
+    season = player_stats.latest_season(club_id)
+    if season is not None:
+        season = {'season': int(season.name),
+                  **{c: _value(season[c]) for c in SQUAD_COLUMNS if c in season}}
+    trend = [(int(year), float(value)) for year, value in player_stats.value_trend(club_id).items()]
+    return season, trend
+
+
+def build_report(data, club1_name, club2_name, window, cache=None, n=SIMULATED_MATCHES):
+    clubs_df = data.clubs
+    players_df = data.players
+
+    with profiling.span('compare.clubs'):
+        # Récupérer les IDs des clubs
+        club1_id = club_id(clubs_df, club1_name)
+        club2_id = club_id(clubs_df, club2_name)
+
+        # Statistiques des clubs (globales)
+        club1_info = clubs_df[clubs_df['club_id'] == club1_id].iloc[0]
+        club2_info = clubs_df[clubs_df['club_id'] == club2_id].iloc[0]
+        # Masques booléens sur toute la table des clubs (nom, puis id), pour chacun des deux clubs
+        profiling.count('rows.clubs', 4 * len(clubs_df))
+
+    # ----- Statistiques générales, face à face et fenêtre choisie -----
+    def compute(id1, id2, w):
+        return stats.compare(id1, id2, data.club_index, data.pair_index, data.club_series, w)
+
+    with profiling.span('compare.stats'):
+        if cache is not None:
+            comparison = cache.get_or_compute(club1_id, club2_id, window, compute)
+        else:
+            comparison = compute(club1_id, club2_id, window)
+    with profiling.span('compare.players'):
+        # Statistiques des joueurs (globales, car actuelles)
+        club1_players = int((players_df['current_club_id'] == club1_id).sum())
+        club2_players = int((players_df['current_club_id'] == club2_id).sum())
+        profiling.count('rows.players', 2 * len(players_df))
+    with profiling.span('compare.elo'):
+        # Probabilités issues du classement Elo (terrain neutre), disponibles même sans confrontation
+        prediction = data.ratings.predict(club1_id, club2_id)
+    with profiling.span('compare.goals'):
+        # Scores et issues du modèle de Poisson déjà ajusté : aucun calcul d'ajustement ici
+        goals = data.goal_model.predict(club1_id, club2_id)
+    with profiling.span('compare.simulation'):
+        simulation = simulate_match(goals.expected1, goals.expected2, n=n)
+    with profiling.span('compare.squads'):
+        # Agrégats d'effectif pré-calculés (dernière saison et évolution de la valeur)
+        squads = tuple(_squad(data.player_stats, i) for i in (club1_id, club2_id)) if data.player_stats else None
+    return ComparisonReport(
+        club1_name=club1_name, club2_name=club2_name, comparison=comparison,
+        club1_players=club1_players, club2_players=club2_players,
+        club1_market_value=_value(club1_info['total_market_value']),
+        club2_market_value=_value(club2_info['total_market_value']),
+        club1_squad_size=_value(club1_info['squad_size']),
+        club2_squad_size=_value(club2_info['squad_size']),
+        prediction=prediction, goals=goals, simulation=simulation, squads=squads,
+    )
+
+
+def build_league(data, names, n=SIMULATED_SEASONS):
+    return simulate_league([club_id(data.clubs, name) for name in names], data.goal_model, n=n)
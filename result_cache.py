@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Caches LRU thread-safe : générique (réponses du serveur) et comparaisons indexées par (club1_id, club2_id, fenêtre)
+# quel que soit l'ordre des clubs.
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Lu depuis le thread de travail et vidé depuis le thread Tk (ou la boucle asyncio)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        return result
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+class ComparisonCache(LRUCache):
+    @staticmethod
+    def key(club1_id, club2_id, window):
+        club1_id, club2_id = int(club1_id), int(club2_id)
+        return min(club1_id, club2_id), max(club1_id, club2_id), window
+
+    def get_or_compute(self, club1_id, club2_id, window, compute):
+        # compute(id_a, id_b, window) doit renvoyer un objet doté de swapped() (stats.Comparison)
+        key = self.key(club1_id, club2_id, window)
+        result = super().get_or_compute(key, lambda: compute(key[0], key[1], window))
+        # Les résultats sont stockés dans l'ordre (id min, id max)
+        return result if int(club1_id) == key[0] else result.swapped()
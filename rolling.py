@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# Fenêtres temporelles quelconques : sommes cumulées par club, triées par date.
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import profiling
+from data_cache import load_arrays, save_arrays
+from stats import ClubStats
+
+# Fenêtres proposées dans l'interface (en années)
+PRESETS = {'1 an': 1, '3 ans': 3, '5 ans': 5, '10 ans': 10}
+DEFAULT_PRESET = '5 ans'
+
+
+def to_datetime64(date):
+    return np.datetime64(pd.Timestamp(date).to_datetime64(), 'ns')
+
+
+@dataclass(frozen=True)
+class Window:
+    since: pd.Timestamp = None
+    until: pd.Timestamp = None
+    label: str = "toute la période"
+
+    @classmethod
+    def last_years(cls, years, now=None):
+        # Arrondi au jour : deux clics le même jour donnent la même fenêtre
+        today = pd.Timestamp(now or datetime.now()).normalize()
+        label = "dernière année" if years == 1 else f"{years} dernières années"
+        return cls(since=today - timedelta(days=years*365), label=label)
+
+    @classmethod
+    def between(cls, since=None, until=None):
+        since = pd.Timestamp(since) if since else None
+        until = pd.Timestamp(until) if until else None
+        if since is not None and until is not None and since > until:
+            raise ValueError("La date de début est postérieure à la date de fin")
+        return cls(since=since, until=until, label="période personnalisée")
+
+    def period(self):
+        if self.since is not None and self.until is not None:
+            return f"du {self.since:%Y-%m-%d} au {self.until:%Y-%m-%d}"
+        if self.since is not None:
+            return f"depuis {self.since:%Y-%m-%d}"
+        if self.until is not None:
+            return f"jusqu'au {self.until:%Y-%m-%d}"
+        return "toutes les dates"
+
+    def bounds(self, dates):
+        # Indices [lo, hi) des matchs de la fenêtre dans un tableau de dates trié
+        lo = 0 if self.since is None else int(np.searchsorted(dates, to_datetime64(self.since), side='left'))
+        hi = len(dates) if self.until is None else int(np.searchsorted(dates, to_datetime64(self.until), side='right'))
+        return lo, max(lo, hi)
+
+
+class ClubSeries:
+    def __init__(self, games):
+        home_ids = games['home_club_id'].to_numpy(dtype=np.int64)
+        away_ids = games['away_club_id'].to_numpy(dtype=np.int64)
+        home_goals = games['home_club_goals'].to_numpy(dtype=np.float64)
+        away_goals = games['away_club_goals'].to_numpy(dtype=np.float64)
+        dates = games['date'].to_numpy().astype('datetime64[ns]')
+
+        # Chaque match apparaît deux fois : du point de vue de chacun des deux clubs
+        club_ids = np.concatenate([home_ids, away_ids])
+        goals_for = np.concatenate([home_goals, away_goals])
+        goals_against = np.concatenate([away_goals, home_goals])
+        dates = np.concatenate([dates, dates])
+
+        order = np.lexsort((dates, club_ids))
+        self.club_ids = club_ids[order]
+        self.dates = dates[order]
+        goals_for, goals_against = goals_for[order], goals_against[order]
+
+        values = np.column_stack([
+            np.ones(len(order), dtype=np.int64),
+            goals_for > goals_against,
+            goals_for < goals_against,
+            np.nan_to_num(goals_for),
+            np.nan_to_num(goals_against),
+        ]).astype(np.int64)
+        # Ligne de zéros en tête : la somme sur [lo, hi) vaut cum[hi] - cum[lo]
+        self.cum = np.vstack([np.zeros((1, values.shape[1]), dtype=np.int64), values.cumsum(axis=0)])
+
+        ids, starts = np.unique(self.club_ids, return_index=True)
+        self._set_ranges(ids, starts)
+
+    def _set_ranges(self, ids, starts):
+        stops = np.append(starts[1:], len(self.club_ids))
+        self._ranges = {club_id: (start, stop) for club_id, start, stop in zip(ids.tolist(), starts, stops)}
+
+    # ----- Persistance (tableaux .npy mappés en mémoire) -----
+    def save(self, directory, source):
+        ids = np.fromiter(self._ranges.keys(), dtype=np.int64, count=len(self._ranges))
+        starts = np.array([start for start, _ in self._ranges.values()], dtype=np.int64)
+        save_arrays(directory, {'club_ids': self.club_ids, 'dates': self.dates, 'cum': self.cum,
+                                'range_ids': ids, 'range_starts': starts}, source)
+
+    @classmethod
+    def load_or_build(cls, directory, games, source):
+        arrays = load_arrays(directory, source)
+        if arrays is not None:
+            series = cls.__new__(cls)
+            series.club_ids, series.dates, series.cum = arrays['club_ids'], arrays['dates'], arrays['cum']
+            series._set_ranges(arrays['range_ids'], arrays['range_starts'])
+            return series
+        series = cls(games)
+        try:
+            series.save(directory, source)
+        except OSError as e:
+            print(f"Impossible d'enregistrer les séries par club : {e}")
+        return series
+
+    def stats(self, club_id, window=None):
+        start, stop = self._ranges.get(int(club_id), (0, 0))
+        if window is not None:
+            lo, hi = window.bounds(self.dates[start:stop])
+            start, stop = start + lo, start + hi
+        # Matchs couverts par la différence de sommes cumulées (aucun parcours ligne à ligne)
+        profiling.count('rows.window', stop - start)
+        matches, wins, losses, goals_for, goals_against = (self.cum[stop] - self.cum[start]).tolist()
+        return ClubStats(matches=matches, wins=wins, draws=matches - wins - losses, losses=losses,
+                         goals_for=goals_for, goals_against=goals_against)
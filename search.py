@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# Index de recherche des clubs : noms normalisés (minuscules, sans accents), n-grammes et acronymes.
+import bisect
+import heapq
+import unicodedata
+from collections import defaultdict
+
+import profiling
+
+MAX_GRAM = 3
+# Résultats affichés à chaque frappe (liste déroulante, /search)
+SEARCH_LIMIT = 20
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+
+
+def acronym(name):
+    words = str(name).split()
+    return ''.join(word[0].upper() for word in words if word)
+
+
+def _grams(text):
+    for n in range(1, MAX_GRAM + 1):
+        for i in range(len(text) - n + 1):
+            yield text[i:i + n]
+
+
+def _build_postings(texts):
+    postings = defaultdict(set)
+    for i, text in enumerate(texts):
+        for gram in _grams(text):
+            postings[gram].add(i)
+    return dict(postings)
+
+
+class ClubSearchIndex:
+    def __init__(self, names):
+        self.names = list(names)
+        self.normalized = [normalize(name) for name in self.names]
+        self.acronyms = [normalize(acronym(name)) for name in self.names]
+        # Début de chaque mot, pour classer "Real" avant "Sporting Real"
+        self.word_starts = [{0} | {i + 1 for i, c in enumerate(text) if c == ' '}
+                            for text in self.normalized]
+        self._name_postings = _build_postings(self.normalized)
+        self._acronym_postings = _build_postings(self.acronyms)
+        # Noms normalisés triés : les noms qui commencent par la requête forment une plage contiguë
+        self._by_name = sorted(range(len(self.names)), key=self.normalized.__getitem__)
+        self._sorted_names = [self.normalized[i] for i in self._by_name]
+
+    def __len__(self):
+        return len(self.names)
+
+    def _candidates(self, postings, texts, query):
+        if len(query) <= MAX_GRAM:
+            # Un n-gramme complet : la liste est exactement l'ensemble des correspondances
+            return postings.get(query, set())
+        sets = sorted((postings.get(query[i:i + MAX_GRAM], set())
+                       for i in range(len(query) - MAX_GRAM + 1)), key=len)
+        candidates = set.intersection(*sets) if sets[0] else set()
+        return {i for i in candidates if query in texts[i]}
+
+    def _rank(self, i, query):
+        name, acro = self.normalized[i], self.acronyms[i]
+        pos = name.find(query)
+        if name == query:
+            category = 0
+        elif pos == 0:
+            category = 1
+        elif pos > 0 and any(name.startswith(query, start) for start in self.word_starts[i]):
+            category = 2
+        elif acro == query:
+            category = 3
+        elif acro.startswith(query):
+            category = 4
+        elif pos > 0:
+            category = 5
+        else:
+            category = 6
+        return category, pos if pos >= 0 else len(name), len(name), i
+
+    def _prefixed(self, query):
+        start = bisect.bisect_left(self._sorted_names, query)
+        end = bisect.bisect_left(self._sorted_names, query + '\U0010ffff', start)
+        return self._by_name[start:end]
+
+    def search(self, query, limit=None):
+        query = normalize(query).strip()
+        if not query:
+            return self.names[:limit] if limit else list(self.names)
+        with profiling.span('search'):
+            if limit:
+                # Les noms qui commencent par la requête sont classés avant tous les autres (catégories 0 et 1) :
+                # s'ils suffisent, inutile de classer le reste
+                prefixed = self._prefixed(query)
+                if len(prefixed) >= limit:
+                    profiling.count('search.candidates', len(prefixed))
+                    ranked = heapq.nsmallest(limit, prefixed, key=lambda i: self._rank(i, query))
+                    return [self.names[i] for i in ranked]
+            matches = (self._candidates(self._name_postings, self.normalized, query)
+                       | self._candidates(self._acronym_postings, self.acronyms, query))
+            profiling.count('search.candidates', len(matches))
+            if limit:
+                # Seuls les premiers sont triés : une lettre seule correspond à presque tous les clubs
+                ranked = heapq.nsmallest(limit, matches, key=lambda i: self._rank(i, query))
+            else:
+                ranked = sorted(matches, key=lambda i: self._rank(i, query))
+        return [self.names[i] for i in ranked]
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+# Service HTTP/JSON local : le jeu de données et les index sont chargés une seule fois et partagés par tous
+# les clients (interface en mode client léger, scripts, navigateur).
+import argparse
+import asyncio
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import replace
+from urllib.parse import parse_qsl, urlsplit
+
+from batch import parse_window
+from dataset import load_dataset
+from report import SIMULATED_MATCHES, SIMULATED_SEASONS, build_league, build_report, jsonable
+from result_cache import ComparisonCache, LRUCache
+from search import SEARCH_LIMIT
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+H2H_GAMES = 50  # confrontations détaillées renvoyées par /h2h (les plus récentes)
+MAX_SIMULATIONS = 10_000_000
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class FootballService:
+    def __init__(self, data, cache_size=1024, workers=None):
+        self.data = data
+        self.ids_by_name = dict(zip(data.clubs['name'].astype(str), data.clubs['club_id'].tolist()))
+        self.names = {club_id: name for name, club_id in self.ids_by_name.items()}
+        self.comparison_cache = ComparisonCache(maxsize=cache_size)
+        # Réponses déjà encodées (octets JSON), indexées par requête normalisée
+        self.responses = LRUCache(maxsize=cache_size)
+        # Calculs numpy / pandas hors de la boucle asyncio
+        self.executor = ThreadPoolExecutor(workers)
+        self._pending = {}
+        self.routes = {
+            '/status': self.status,
+            '/clubs': self.clubs,
+            '/search': self.search,
+            '/h2h': self.h2h,
+            '/compare': self.compare,
+            '/league': self.league,
+        }
+
+    # ----- Lecture des paramètres (sur la boucle : rapide, lève HTTPError) -----
+    def _club(self, value):
+        value = str(value).strip()
+        if value.lstrip('-').isdigit() and int(value) in self.names:
+            return int(value)
+        if value in self.ids_by_name:
+            return self.ids_by_name[value]
+        raise HTTPError(404, f"Club introuvable : {value}")
+
+    @staticmethod
+    def _required(params, *names):
+        missing = [name for name in names if not params.get(name)]
+        if missing:
+            raise HTTPError(400, f"Paramètres manquants : {', '.join(missing)}")
+        return [params[name] for name in names]
+
+    def _clubs(self, values):
+        ids = [self._club(value) for value in values]
+        if len(set(ids)) < len(ids):
+            raise HTTPError(400, "Veuillez choisir des clubs différents")
+        return ids
+
+    @staticmethod
+    def _int(params, name, default, maximum=None):
+        try:
+            value = int(params.get(name, default))
+        except ValueError:
+            raise HTTPError(400, f"Paramètre {name} invalide : {params[name]}") from None
+        if value < 1 or (maximum is not None and value > maximum):
+            raise HTTPError(400, f"Paramètre {name} hors limites : {value}")
+        return value
+
+    @staticmethod
+    def _window(params):
+        # Mêmes conventions que batch.py : window "5 ans" / "5" / "all", ou since / until (+ label)
+        try:
+            window = parse_window(params)
+        except ValueError as e:
+            raise HTTPError(400, f"Période invalide : {e}") from None
+        return replace(window, label=params['label']) if params.get('label') else window
+
+    # ----- Routes : (clé de cache ou None, calcul à exécuter dans l'exécuteur) -----
+    def status(self, params):
+        data = self.data
+        return None, lambda: {
+            'data_dir': data.data_dir, 'clubs': len(data.clubs), 'games': len(data.games),
+            'cutoff_date': data.cutoff_date, 'responses': self.responses.info(),
+            'comparisons': self.comparison_cache.info(),
+        }
+
+    def clubs(self, params):
+        return ('clubs',), lambda: {'names': self.data.search_index.names}
+
+    def search(self, params):
+        query = params.get('q', '')
+        limit = self._int(params, 'limit', SEARCH_LIMIT)
+        return ('search', query, limit), lambda: {
+            'query': query, 'results': self.data.search_index.search(query, limit=limit)}
+
+    def h2h(self, params):
+        club1_id, club2_id = self._clubs(self._required(params, 'club1', 'club2'))
+        window = self._window(params)
+        limit = self._int(params, 'games', H2H_GAMES)
+
+        def compute():
+            h2h = self.data.pair_index.head_to_head(club1_id, club2_id, window)
+            games = self.data.pair_index.games(club1_id, club2_id, window).tail(limit)
+            return {'club1_id': club1_id, 'club1': self.names[club1_id],
+                    'club2_id': club2_id, 'club2': self.names[club2_id], 'window': window,
+                    'head_to_head': h2h, 'proba1': h2h.proba1, 'proba2': h2h.proba2, 'proba_draw': h2h.proba_draw,
+                    'games': games.to_dict('records')}
+        return ('h2h', club1_id, club2_id, window, limit), compute
+
+    def compare(self, params):
+        club1_id, club2_id = self._clubs(self._required(params, 'club1', 'club2'))
+        window = self._window(params)
+        n = self._int(params, 'n', SIMULATED_MATCHES, MAX_SIMULATIONS)
+        return ('compare', club1_id, club2_id, window, n), lambda: build_report(
+            self.data, self.names[club1_id], self.names[club2_id], window, self.comparison_cache, n=n)
+
+    def league(self, params):
+        names = [name for name in params.get('clubs', '').split(';') if name.strip()]
+        if len(names) < 2:
+            raise HTTPError(400, "Il faut au moins deux clubs pour un championnat")
+        ids = self._clubs(names)
+        n = self._int(params, 'n', SIMULATED_SEASONS, MAX_SIMULATIONS)
+
+        def compute():
+            league = build_league(self.data, [self.names[i] for i in ids], n=n)
+            return {'names': [self.names[i] for i in ids], **jsonable(league)}
+        return ('league', tuple(ids), n), compute
+
+    # ----- Exécution et cache -----
+    async def _encode(self, compute):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, lambda: json.dumps(jsonable(compute()), ensure_ascii=False).encode('utf-8'))
+
+    async def _cached(self, key, compute):
+        body = self.responses.get(key)
+        if body is not None:
+            return body, True
+        # Requêtes identiques simultanées (plusieurs clients) : un seul calcul, partagé
+        task = self._pending.get(key)
+        if task is not None:
+            return await asyncio.shield(task), True
+        task = asyncio.ensure_future(self._encode(compute))
+        self._pending[key] = task
+        try:
+            body = await asyncio.shield(task)
+        finally:
+            if task.done():
+                del self._pending[key]
+            else:
+                task.add_done_callback(lambda _: self._pending.pop(key, None))
+        self.responses.put(key, body)
+        return body, False
+
+    async def dispatch(self, method, target):
+        # Renvoie (statut, corps JSON, réponse issue du cache)
+        try:
+            if method != 'GET':
+                raise HTTPError(405, f"Méthode non prise en charge : {method}")
+            url = urlsplit(target)
+            route = self.routes.get(url.path.rstrip('/') or '/')
+            if route is None:
+                raise HTTPError(404, f"Route inconnue : {url.path}")
+            key, compute = route(dict(parse_qsl(url.query)))
+            if key is None:
+                return 200, await self._encode(compute), False
+            body, cached = await self._cached(key, compute)
+            return 200, body, cached
+        except HTTPError as e:
+            status, message = e.status, str(e)
+        except Exception as e:
+            print(f"Erreur sur {target} : {e!r}", file=sys.stderr)
+            status, message = 500, str(e)
+        return status, json.dumps({'error': message}, ensure_ascii=False).encode('utf-8'), False
+
+    # ----- HTTP/1.1 minimal (GET uniquement, connexions persistantes) -----
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request = await reader.readline()
+                if not request.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request.decode('latin-1').split()
+                except ValueError:
+                    method, target, version = '', '/', 'HTTP/1.0'
+                status, body, cached = await self.dispatch(method, target)
+                keep_alive = (version == 'HTTP/1.1' and method == 'GET'
+                              and headers.get('connection', '').lower() != 'close')
+                writer.write((f"{version} {status} {REASONS[status]}\r\n"
+                              "Content-Type: application/json; charset=utf-8\r\n"
+                              f"Content-Length: {len(body)}\r\n"
+                              f"X-Cache: {'hit' if cached else 'miss'}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode('latin-1')
+                             + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Client parti, ou arrêt du serveur pendant une connexion persistante
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Service disponible sur http://{host}:{port}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+class BackgroundServer:
+    # Service lancé dans un thread (essais sur une instance locale, jeu de données synthétique) ; port 0 = port libre
+    def __init__(self, service, host=DEFAULT_HOST, port=0):
+        self.service = service
+        self.host = host
+        self.port = port
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self.service.handle, self.host, self.port))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            server.close()
+            # Connexions persistantes encore ouvertes
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.run_until_complete(server.wait_closed())
+            self._loop.close()
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return self.url
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self.service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service JSON local de comparaison des clubs")
+    parser.add_argument("--data-dir", help="Dossier local du jeu de données (pas de téléchargement Kaggle)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Adresse d'écoute (défaut : machine locale seulement)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cache-size", type=int, default=1024, help="Réponses gardées en mémoire")
+    parser.add_argument("-j", "--workers", type=int, help="Threads de calcul")
+    args = parser.parse_args(argv)
+
+    # Chargement unique, avant d'accepter des connexions
+    with redirect_stdout(sys.stderr):
+        data = load_dataset(args.data_dir, progress=lambda message: print(message, file=sys.stderr))
+    service = FootballService(data, cache_size=args.cache_size, workers=args.workers)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# Simulations de Monte Carlo vectorisées : matchs entre deux clubs et mini-championnats aller-retour.
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+CHUNK_SIZE = 1_000_000
+MAX_GOALS = 10
+
+
+@dataclass(frozen=True)
+class MatchSimulation:
+    n: int
+    win1: float
+    draw: float
+    win2: float
+    points1: float
+    points2: float
+    scores: np.ndarray  # scores[i, j] = fréquence du score i-j (buts plafonnés à MAX_GOALS)
+
+
+@dataclass(frozen=True)
+class LeagueSimulation:
+    n: int
+    club_ids: tuple
+    expected_points: np.ndarray
+    expected_goal_difference: np.ndarray
+    positions: np.ndarray  # positions[c, p] = probabilité que le club c finisse à la place p + 1
+
+
+def _chunks(n, chunk_size):
+    sizes = [chunk_size] * (n // chunk_size)
+    if n % chunk_size:
+        sizes.append(n % chunk_size)
+    return sizes
+
+
+def _run(worker, n, args, seed, chunk_size, workers):
+    # Découpe en blocs (mémoire bornée) avec un flux aléatoire indépendant par bloc
+    sizes = _chunks(n, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(size, s) + args for size, s in zip(sizes, seeds)]
+    if workers and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            return list(pool.map(worker, *zip(*tasks)))
+    return [worker(*task) for task in tasks]
+
+
+# ----- Match entre deux clubs -----
+def _match_chunk(size, seed, expected1, expected2):
+    rng = np.random.default_rng(seed)
+    goals1 = np.minimum(rng.poisson(expected1, size), MAX_GOALS)
+    goals2 = np.minimum(rng.poisson(expected2, size), MAX_GOALS)
+    return np.bincount(goals1 * (MAX_GOALS + 1) + goals2,
+                       minlength=(MAX_GOALS + 1) ** 2).reshape(MAX_GOALS + 1, MAX_GOALS + 1)
+
+
+def simulate_match(expected1, expected2, n=1_000_000, seed=None, chunk_size=CHUNK_SIZE, workers=None):
+    # Buts tirés selon des lois de Poisson (goal_model.GoalModel.expected_goals)
+    counts = sum(_run(_match_chunk, n, (expected1, expected2), seed, chunk_size, workers))
+    scores = counts / n
+    win1, draw, win2 = float(np.tril(scores, -1).sum()), float(np.trace(scores)), float(np.triu(scores, 1).sum())
+    return MatchSimulation(n=n, win1=win1, draw=draw, win2=win2,
+                           points1=3 * win1 + draw, points2=3 * win2 + draw, scores=scores)
+
+
+def _outcome_chunk(size, seed, probabilities):
+    rng = np.random.default_rng(seed)
+    return np.bincount(rng.choice(3, size=size, p=probabilities), minlength=3)
+
+
+def simulate_outcomes(win1, draw, win2, n=1_000_000, seed=None, chunk_size=CHUNK_SIZE, workers=None):
+    # Variante sans scores, à partir de probabilités d'issue (Laplace, Elo...)
+    probabilities = np.array([win1, draw, win2], dtype=np.float64)
+    counts = sum(_run(_outcome_chunk, n, (probabilities / probabilities.sum(),), seed, chunk_size, workers))
+    win1, draw, win2 = (counts / n).tolist()
+    return MatchSimulation(n=n, win1=win1, draw=draw, win2=win2,
+                           points1=3 * win1 + draw, points2=3 * win2 + draw, scores=None)
+
+
+# ----- Mini-championnat -----
+def fixtures(n_clubs):
+    # Aller-retour : chaque club reçoit chacun des autres une fois
+    home, away = np.nonzero(~np.eye(n_clubs, dtype=bool))
+    return home, away
+
+
+def _league_chunk(size, seed, home, away, expected_home, expected_away, n_clubs):
+    rng = np.random.default_rng(seed)
+    home_goals = rng.poisson(expected_home, (size, len(home)))
+    away_goals = rng.poisson(expected_away, (size, len(home)))
+    home_points = np.where(home_goals > away_goals, 3, np.where(home_goals == away_goals, 1, 0))
+    away_points = np.where(home_goals < away_goals, 3, np.where(home_goals == away_goals, 1, 0))
+
+    # Matrices d'incidence match -> club : les totaux par club sont deux produits matriciels
+    home_of = np.zeros((len(home), n_clubs))
+    home_of[np.arange(len(home)), home] = 1
+    away_of = np.zeros((len(home), n_clubs))
+    away_of[np.arange(len(home)), away] = 1
+    points = home_points @ home_of + away_points @ away_of
+    goals_for = home_goals @ home_of + away_goals @ away_of
+    goals_against = away_goals @ home_of + home_goals @ away_of
+    goal_difference = goals_for - goals_against
+
+    # Classement : points, différence de buts, buts marqués, puis tirage au sort
+    key = points * 1e8 + (goal_difference + 1e3) * 1e4 + goals_for + rng.random(points.shape)
+    ranks = np.argsort(np.argsort(-key, axis=1), axis=1)
+    positions = np.zeros((n_clubs, n_clubs), dtype=np.int64)
+    np.add.at(positions, (np.broadcast_to(np.arange(n_clubs), ranks.shape), ranks), 1)
+    return points.sum(axis=0), goal_difference.sum(axis=0), positions
+
+
+def simulate_league(club_ids, goal_model, n=10_000, seed=None, chunk_size=5_000, workers=None):
+    club_ids = tuple(int(club_id) for club_id in club_ids)
+    if len(club_ids) < 2:
+        raise ValueError("Il faut au moins deux clubs pour un championnat")
+    home, away = fixtures(len(club_ids))
+    expected = [goal_model.expected_goals(club_ids[h], club_ids[a], club1_home=True) for h, a in zip(home, away)]
+    expected_home, expected_away = (np.array(values) for values in zip(*expected))
+
+    parts = _run(_league_chunk, n, (home, away, expected_home, expected_away, len(club_ids)),
+                 seed, chunk_size, workers)
+    points, goal_difference, positions = (sum(values) for values in zip(*parts))
+    return LeagueSimulation(n=n, club_ids=club_ids, expected_points=points / n,
+                            expected_goal_difference=goal_difference / n, positions=positions / n)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Moteur de statistiques vectorisé (sans Tkinter) utilisé par compare_clubs.
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ClubStats:
+    matches: int
+    wins: int
+    draws: int
+    losses: int
+    goals_for: int
+    goals_against: int
+
+    @property
+    def winrate(self):
+        # En pourcentage, comme affiché dans l'interface
+        return self.wins / self.matches * 100 if self.matches > 0 else 0
+
+    @property
+    def avg_goals(self):
+        return self.goals_for / self.matches if self.matches > 0 else 0
+
+
+@dataclass(frozen=True)
+class HeadToHeadStats:
+    matches: int
+    wins1: int
+    wins2: int
+    draws: int
+    goals1: int
+    goals2: int
+
+    # ----- Probabilités avec la loi de Laplace -----
+    @property
+    def proba1(self):
+        return (self.wins1 + 1) / (self.matches + 2) if self.matches > 0 else 0.5
+
+    @property
+    def proba2(self):
+        return (self.wins2 + 1) / (self.matches + 2) if self.matches > 0 else 0.5
+
+    @property
+    def proba_draw(self):
+        return (self.draws + 1) / (self.matches + 2) if self.matches > 0 else 0.5
+
+    def swapped(self):
+        return HeadToHeadStats(matches=self.matches, wins1=self.wins2, wins2=self.wins1, draws=self.draws,
+                               goals1=self.goals2, goals2=self.goals1)
+
+    @property
+    def avg_goals1(self):
+        return self.goals1 / self.matches if self.matches > 0 else 0
+
+    @property
+    def avg_goals2(self):
+        return self.goals2 / self.matches if self.matches > 0 else 0
+
+
+@dataclass(frozen=True)
+class Comparison:
+    club1_id: int
+    club2_id: int
+    club1: ClubStats
+    club2: ClubStats
+    head_to_head: HeadToHeadStats
+    window: object
+    club1_window: ClubStats
+    club2_window: ClubStats
+    head_to_head_window: HeadToHeadStats
+
+    def swapped(self):
+        # Même comparaison vue depuis l'autre club
+        return Comparison(club1_id=self.club2_id, club2_id=self.club1_id, club1=self.club2, club2=self.club1,
+                          head_to_head=self.head_to_head.swapped(), window=self.window,
+                          club1_window=self.club2_window, club2_window=self.club1_window,
+                          head_to_head_window=self.head_to_head_window.swapped())
+
+
+def _columns(games):
+    return (games['home_club_id'].to_numpy(), games['away_club_id'].to_numpy(),
+            games['home_club_goals'].to_numpy(), games['away_club_goals'].to_numpy())
+
+
+def club_stats(club_id, games):
+    home_ids, away_ids, home_goals, away_goals = _columns(games)
+    at_home = home_ids == club_id
+    played = at_home | (away_ids == club_id)
+
+    # Buts du point de vue du club (pour / contre)
+    at_home = at_home[played]
+    goals_for = np.where(at_home, home_goals[played], away_goals[played])
+    goals_against = np.where(at_home, away_goals[played], home_goals[played])
+
+    matches = int(played.sum())
+    wins = int(np.count_nonzero(goals_for > goals_against))
+    losses = int(np.count_nonzero(goals_for < goals_against))
+    return ClubStats(matches=matches, wins=wins, draws=matches - wins - losses, losses=losses,
+                     goals_for=int(np.nansum(goals_for)), goals_against=int(np.nansum(goals_against)))
+
+
+def head_to_head(club1_id, club2_id, games):
+    home_ids, away_ids, home_goals, away_goals = _columns(games)
+    club1_home = (home_ids == club1_id) & (away_ids == club2_id)
+    mask = club1_home | ((home_ids == club2_id) & (away_ids == club1_id))
+    return head_to_head_from(club1_home[mask], home_goals[mask], away_goals[mask])
+
+
+def head_to_head_from(club1_home, home_goals, away_goals):
+    goals1 = np.where(club1_home, home_goals, away_goals)
+    goals2 = np.where(club1_home, away_goals, home_goals)
+
+    matches = len(goals1)
+    wins1 = int(np.count_nonzero(goals1 > goals2))
+    wins2 = int(np.count_nonzero(goals1 < goals2))
+    # Tout ce qui n'est ni une victoire ni une défaite compte comme nul (y compris les scores manquants)
+    return HeadToHeadStats(matches=matches, wins1=wins1, wins2=wins2, draws=matches - wins1 - wins2,
+                           goals1=int(np.nansum(goals1)), goals2=int(np.nansum(goals2)))
+
+
+def compare(club1_id, club2_id, club_index, pair_index, club_series, window):
+    # Toutes les recherches passent par des index pré-calculés :
+    # club_index.ClubIndex (global), rolling.ClubSeries (fenêtre), pair_index.PairIndex (face à face)
+    return Comparison(
+        club1_id=club1_id,
+        club2_id=club2_id,
+        club1=club_index.stats(club1_id),
+        club2=club_index.stats(club2_id),
+        head_to_head=pair_index.head_to_head(club1_id, club2_id),
+        window=window,
+        club1_window=club_series.stats(club1_id, window),
+        club2_window=club_series.stats(club2_id, window),
+        head_to_head_window=pair_index.head_to_head(club1_id, club2_id, window),
+    )
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# Jeu de données synthétique au format Kaggle (clubs.csv, games.csv, players.csv), de 10 000 à 50 millions de matchs :
+# mesures de performance et essais hors ligne, sans téléchargement. games.csv est écrit par blocs (mémoire bornée).
+import argparse
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+CHUNK_SIZE = 1_000_000
+LEAGUE_SIZE = 20
+CUP_SHARE = 0.1  # part des matchs entre clubs de championnats différents (coupes)
+PLAYERS_PER_CLUB = 25
+FIRST_DATE = '2000-07-01'
+# Buts : log(moyenne) = base + avantage du terrain + attaque - défense, comme goal_model.GoalModel
+BASE_RATE = 0.2
+HOME_ADVANTAGE = 0.25
+STRENGTH_SPREAD = 0.3
+
+PREFIXES = ['FC', 'AS', 'SC', 'Real', 'Sporting', 'Olympique', 'Racing', 'Atlético', 'Dynamo', 'Union',
+            'Athletic', 'Inter', 'Stade', 'Deportivo', 'Borussia', 'Royal', 'Lokomotiv', 'Vitória']
+SUFFIXES = ['', '', '', '', 'United', 'City', 'Town', 'Rovers', 'Wanderers', 'Calcio', '1899', '04']
+SYLLABLES = ['ma', 'ri', 'bo', 'lé', 'san', 'to', 'vi', 'la', 'ber', 'gen', 'mü', 'ro', 'na', 'ca', 'sé',
+             'vil', 'port', 'del', 'cas', 'ti', 'go', 'ar', 'ne', 'lu', 'ké', 'zag', 'bur', 'ço']
+FIRST_NAMES = ['Lucas', 'João', 'Mehdi', 'Jan', 'Luka', 'Mateo', 'Kylian', 'Ömer', 'Sven', 'Diego', 'Yann', 'Ali']
+LAST_NAMES = ['Martin', 'Silva', 'Müller', 'García', 'Novák', 'Rossi', 'Diallo', 'Petrović', 'Jansen', 'Yılmaz']
+POSITIONS = ['Goalkeeper', 'Defender', 'Midfield', 'Attack']
+
+
+def club_names(n, rng):
+    # Noms variés (préfixes, accents, homonymes partiels) pour que la recherche travaille comme sur le vrai jeu
+    names, seen = [], set()
+    while len(names) < n:
+        city = ''.join(rng.choice(SYLLABLES, rng.integers(2, 4))).capitalize()
+        name = ' '.join(part for part in (rng.choice(PREFIXES), city, rng.choice(SUFFIXES)) if part)
+        if name in seen:
+            name = f"{name} {len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def make_clubs(n_clubs, rng):
+    club_ids = np.sort(rng.choice(10 * n_clubs + 1000, n_clubs, replace=False) + 1)
+    leagues = np.arange(n_clubs) // LEAGUE_SIZE
+    names = club_names(n_clubs, rng)
+    return pd.DataFrame({
+        'club_id': club_ids,
+        'club_code': [name.lower().replace(' ', '-') for name in names],
+        'name': names,
+        'domestic_competition_id': [f"L{league}" for league in leagues],
+        # Comme dans le jeu réel, la valeur totale est souvent absente
+        'total_market_value': np.where(rng.random(n_clubs) < 0.7, np.nan,
+                                       np.round(rng.lognormal(4, 1, n_clubs), 2)),
+        'squad_size': rng.integers(18, 36, n_clubs),
+        'average_age': np.round(rng.normal(25.5, 1.5, n_clubs), 1),
+        'stadium_seats': rng.integers(2_000, 90_000, n_clubs),
+        'last_season': 2024,
+    })
+
+
+def make_players(clubs, rng, players_per_club=PLAYERS_PER_CLUB):
+    n = len(clubs) * players_per_club
+    first, last = rng.choice(FIRST_NAMES, n), rng.choice(LAST_NAMES, n)
+    return pd.DataFrame({
+        'player_id': np.arange(1, n + 1),
+        'first_name': first,
+        'last_name': last,
+        'name': np.char.add(np.char.add(first, ' '), last),
+        'last_season': 2024,
+        'current_club_id': np.repeat(clubs['club_id'].to_numpy(), players_per_club),
+        'position': rng.choice(POSITIONS, n),
+        'date_of_birth': (pd.Timestamp('1985-01-01')
+                          + pd.to_timedelta(rng.integers(0, 20 * 365, n), 'D')).strftime('%Y-%m-%d'),
+        'market_value_in_eur': rng.integers(1, 500, n) * 100_000,
+    })
+
+
+def calendar(first_date, last_date):
+    # Libellés de date et saison calculés une fois par jour, pas une fois par match
+    days = pd.date_range(first_date, last_date, freq='D')
+    return days.strftime('%Y-%m-%d').to_numpy(), (days.year - (days.month < 7)).to_numpy()
+
+
+def make_games(clubs, start, size, rng, days, attack, defence):
+    n_clubs = len(clubs)
+    club_ids = clubs['club_id'].to_numpy()
+    names = clubs['name'].to_numpy()
+    competitions = clubs['domestic_competition_id'].to_numpy()
+    leagues = np.arange(n_clubs) // LEAGUE_SIZE
+    league_start = leagues * LEAGUE_SIZE
+    league_size = np.minimum(LEAGUE_SIZE, n_clubs - league_start)
+
+    # Championnat : adversaire du même groupe de LEAGUE_SIZE clubs ; coupe : n'importe quel autre club
+    home = rng.integers(0, n_clubs, size)
+    cup = (rng.random(size) < CUP_SHARE) | (league_size[home] < 2)
+    offset = np.where(cup, rng.integers(1, n_clubs, size),
+                      rng.integers(1, np.maximum(league_size[home], 2), size))
+    away = np.where(cup, (home + offset) % n_clubs,
+                    league_start[home] + (home - league_start[home] + offset) % np.maximum(league_size[home], 1))
+
+    labels, seasons = days
+    day = rng.integers(0, len(labels), size)
+    return pd.DataFrame({
+        'game_id': np.arange(start, start + size) + 1,
+        'competition_id': np.where(cup, 'CL', competitions[home]),
+        'season': seasons[day],
+        'round': np.where(cup, 'Group Stage', '1. Matchday'),
+        'date': labels[day],
+        'home_club_id': club_ids[home],
+        'away_club_id': club_ids[away],
+        'home_club_goals': rng.poisson(np.exp(BASE_RATE + HOME_ADVANTAGE + attack[home] - defence[away])),
+        'away_club_goals': rng.poisson(np.exp(BASE_RATE + attack[away] - defence[home])),
+        'attendance': rng.integers(500, 80_000, size),
+        'home_club_name': names[home],
+        'away_club_name': names[away],
+        'competition_type': np.where(cup, 'international_cup', 'domestic_league'),
+    })
+
+
+def generate(data_dir, games=100_000, clubs=1_000, seed=0, chunk_size=CHUNK_SIZE, first_date=FIRST_DATE,
+             last_date=None, progress=print):
+    rng = np.random.default_rng(seed)
+    days = calendar(pd.Timestamp(first_date), pd.Timestamp(last_date or datetime.now()).normalize())
+    os.makedirs(data_dir, exist_ok=True)
+
+    clubs_df = make_clubs(clubs, rng)
+    clubs_df.to_csv(os.path.join(data_dir, 'clubs.csv'), index=False)
+    make_players(clubs_df, rng).to_csv(os.path.join(data_dir, 'players.csv'), index=False)
+
+    attack = rng.normal(0, STRENGTH_SPREAD, clubs)
+    defence = rng.normal(0, STRENGTH_SPREAD, clubs)
+    path = os.path.join(data_dir, 'games.csv')
+    for start in range(0, games, chunk_size):
+        size = min(chunk_size, games - start)
+        chunk = make_games(clubs_df, start, size, rng, days, attack, defence)
+        chunk.to_csv(path, index=False, mode='w' if start == 0 else 'a', header=start == 0)
+        progress(f"games.csv : {start + size}/{games} matchs")
+    return data_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère un jeu de données synthétique au format Kaggle")
+    parser.add_argument("data_dir", help="Dossier de sortie (clubs.csv, games.csv, players.csv)")
+    parser.add_argument("--games", type=int, default=100_000, help="Nombre de matchs (10 000 à 50 millions)")
+    parser.add_argument("--clubs", type=int, default=1_000, help="Nombre de clubs (500 à 50 000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Matchs écrits par bloc")
+    parser.add_argument("--since", default=FIRST_DATE, help="Date du premier match possible")
+    args = parser.parse_args(argv)
+    generate(args.data_dir, games=args.games, clubs=args.clubs, seed=args.seed, chunk_size=args.chunk_size,
+             first_date=args.since)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,61 @@
 # -*- coding: utf-8 -*-
+import argparse
+import queue
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
 from scipy.stats import norm
-from datetime import datetime, timedelta
-import kagglehub
 
-# Authentification si nécessaire
-kagglehub.login()
+import profiling
+from client import ServiceClient
+from plot import ComparisonPlot
+from report import build_league, build_report
+from result_cache import ComparisonCache
+from rolling import DEFAULT_PRESET, PRESETS, Window
+from search import SEARCH_LIMIT, acronym
+from dataset import load_dataset
 
-# Télécharger tous les fichiers du dataset
-local_path = kagglehub.dataset_download(
-    "davidcariboo/player-scores",
-    force_download=False
-)
-
-print("Jeu de données téléchargé dans :", local_path)
+CUSTOM_WINDOW = "Personnalisé"
 
 class FootballComparisonApp:
-    def __init__(self, root):
+    def __init__(self, root, data_dir=None, server=None):
         self.root = root
         self.root.title("Comparaison des Clubs de Football")
         self.root.geometry("800x600")
         self.root.state('zoomed')
+
+        self.data_dir = data_dir
+        self.data = None
+        # Client léger : calculs délégués au service partagé (server.py), rien n'est chargé localement
+        self.client = ServiceClient(server) if server else None
+        self.search_index = None
+        self.club_names = []
+        # Recherche différée : seule la dernière frappe est traitée
+        self.search_delay_ms = 150
+        self._search_jobs = {}
+        # Un seul thread de travail : chargement puis calculs, jamais sur le thread Tk
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.progress_queue = queue.Queue()
+        # Comparaisons déjà calculées (derbys, affiches fréquentes)
+        self.comparison_cache = ComparisonCache(maxsize=256)
+        # Mesures prises depuis le début de l'opération en cours (profiling.mark)
+        self._profile_mark = profiling.mark()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # ----- Barre d'état -----
+        status_frame = ttk.Frame(self.root, padding="5")
+        status_frame.pack(side="bottom", fill="x")
+        self.status_var = tk.StringVar(value="Démarrage...")
+        ttk.Label(status_frame, textvariable=self.status_var).pack(side="left")
+        # Détail des temps de la dernière opération (FOOTBALL_PROFILE ou --profile)
+        self.profile_var = tk.StringVar()
+        if profiling.enabled():
+            ttk.Label(status_frame, textvariable=self.profile_var, foreground="gray").pack(side="left", padx=(15, 0))
+        self.progress = ttk.Progressbar(status_frame, mode="indeterminate", length=200)
+        self.progress.pack(side="right")
+
         # ----- 1. Zone défilante -----
         container = ttk.Frame(self.root)
         container.pack(fill="both", expand=True)
@@ -50,34 +79,7 @@ class FootballComparisonApp:
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
         self.canvas.bind_all("<Shift-MouseWheel>", self._on_shift_mousewheel)
 
-        # ----- 2. Chargement des données -----
-        try:
-            self.clubs_df = pd.read_csv(f'{local_path}/clubs.csv')
-            self.games_df = pd.read_csv(f'{local_path}/games.csv')
-            self.players_df = pd.read_csv(f'{local_path}/players.csv')
-            
-            # Convertir la colonne 'date' en datetime
-            self.games_df['date'] = pd.to_datetime(self.games_df['date'])
-            current_date = datetime.now()
-            cutoff_date = current_date - timedelta(days=5*365)  # Approximativement 5 ans
-            self.games_df_recent = self.games_df[self.games_df['date'] >= cutoff_date]
-            
-            print(f"Date actuelle : {current_date.strftime('%Y-%m-%d')}")
-            print(f"Date de coupure (5 ans avant) : {cutoff_date.strftime('%Y-%m-%d')}")
-            print(f"Matchs totaux : {len(self.games_df)}")
-            print(f"Matchs filtrés (5 dernières années) : {len(self.games_df_recent)}")
-            
-        except FileNotFoundError:
-            messagebox.showerror("Erreur", "Fichiers CSV manquants !")
-            return
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors du chargement des données : {str(e)}")
-            return
-
-        self.club_names = self.clubs_df['name'].tolist()
-        self.acronyms = {n: self.generate_acronym(n) for n in self.club_names}
-
-        # ----- 3. Widgets -----
+        # ----- 2. Widgets -----
         ttk.Label(self.main_frame, text="Club 1:").grid(row=0, column=0, pady=5, sticky=tk.W)
         self.club1_search_var = tk.StringVar()
         entry1 = ttk.Entry(self.main_frame, textvariable=self.club1_search_var)
@@ -98,12 +100,39 @@ class FootballComparisonApp:
         self.club2_combo = ttk.Combobox(self.main_frame, textvariable=self.club2_var, values=self.club_names)
         self.club2_combo.grid(row=3, column=1, pady=5)
 
-        ttk.Button(self.main_frame, text="Comparer", command=self.compare_clubs)\
-            .grid(row=4, column=0, columnspan=2, pady=10)
+        # Fenêtre temporelle : années prédéfinies ou dates personnalisées (AAAA-MM-JJ)
+        ttk.Label(self.main_frame, text="Période:").grid(row=4, column=0, pady=5, sticky=tk.W)
+        window_frame = ttk.Frame(self.main_frame)
+        window_frame.grid(row=4, column=1, pady=5)
+        self.window_var = tk.StringVar(value=DEFAULT_PRESET)
+        ttk.Combobox(window_frame, textvariable=self.window_var, state="readonly", width=12,
+                     values=list(PRESETS) + [CUSTOM_WINDOW]).pack(side="left")
+        ttk.Label(window_frame, text="Du").pack(side="left", padx=(10, 2))
+        self.since_var = tk.StringVar()
+        ttk.Entry(window_frame, textvariable=self.since_var, width=11).pack(side="left")
+        ttk.Label(window_frame, text="Au").pack(side="left", padx=(10, 2))
+        self.until_var = tk.StringVar()
+        ttk.Entry(window_frame, textvariable=self.until_var, width=11).pack(side="left")
+
+        # Activé une fois les données chargées
+        self.compare_button = ttk.Button(self.main_frame, text="Comparer", command=self.compare_clubs,
+                                         state="disabled")
+        self.compare_button.grid(row=5, column=0, columnspan=2, pady=10)
+
+        # Mini-championnat aller-retour entre les clubs saisis
+        ttk.Label(self.main_frame, text="Championnat:").grid(row=6, column=0, pady=5, sticky=tk.W)
+        league_frame = ttk.Frame(self.main_frame)
+        league_frame.grid(row=6, column=1, pady=5)
+        self.league_var = tk.StringVar()
+        ttk.Entry(league_frame, textvariable=self.league_var, width=50).pack(side="left")
+        self.league_button = ttk.Button(league_frame, text="Simuler", command=self.simulate_league,
+                                        state="disabled")
+        self.league_button.pack(side="left", padx=(5, 0))
+        ttk.Label(self.main_frame, text="(noms des clubs séparés par ;)").grid(row=7, column=1, sticky=tk.W)
 
         # Créer un cadre pour le widget Text et la Scrollbar
         text_frame = ttk.Frame(self.main_frame)
-        text_frame.grid(row=5, column=0, columnspan=2, pady=10)
+        text_frame.grid(row=8, column=0, columnspan=2, pady=10)
         
         # Créer le widget Text
         self.result_text = tk.Text(text_frame, height=25, width=80)
@@ -120,6 +149,94 @@ class FootballComparisonApp:
         text_frame.grid_rowconfigure(0, weight=1)
         text_frame.grid_columnconfigure(0, weight=1)
 
+        # Graphique persistant, affiché à la première comparaison
+        self.plot = ComparisonPlot(self.main_frame, row=9)
+
+        # ----- 3. Chargement des données en arrière-plan -----
+        self.root.after_idle(self.load_data)
+
+    def on_close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.plot.destroy()
+        self.root.destroy()
+
+    # ----- Exécution hors du thread Tk -----
+    def _set_busy(self, message):
+        self.status_var.set(message)
+        self.progress.start(10)
+
+    def _set_idle(self, message):
+        self.progress.stop()
+        self.status_var.set(message)
+
+    def run_in_background(self, func, callback, error_message, *args, button=None):
+        # button : désactivé pendant le calcul, réactivé quelle que soit l'issue (résultat ou erreur)
+        if button is not None:
+            button.state(['disabled'])
+        future = self.executor.submit(func, *args)
+        self.root.after(50, self._poll_future, future, callback, error_message, button)
+        return future
+
+    def _poll_future(self, future, callback, error_message, button=None):
+        # Messages de progression envoyés par le thread de travail
+        while not self.progress_queue.empty():
+            self.status_var.set(self.progress_queue.get_nowait())
+        if not future.done():
+            self.root.after(50, self._poll_future, future, callback, error_message, button)
+            return
+        if button is not None:
+            button.state(['!disabled'])
+        try:
+            result = future.result()
+        except FileNotFoundError:
+            self._set_idle("Erreur")
+            messagebox.showerror("Erreur", "Fichiers CSV manquants !")
+            return
+        except KeyError as e:
+            # Message sans les guillemets ajoutés par str(KeyError)
+            self._set_idle("Erreur")
+            messagebox.showerror("Erreur", f"{error_message} : {e.args[0]}")
+            return
+        except Exception as e:
+            self._set_idle("Erreur")
+            messagebox.showerror("Erreur", f"{error_message} : {str(e)}")
+            return
+        callback(result)
+
+    def load_data(self):
+        self._profile_mark = profiling.mark()
+        if self.client is not None:
+            self._set_busy(f"Connexion à {self.client.url}...")
+            self.run_in_background(self.client.connect, self.on_connected, "Serveur injoignable")
+            return
+        self._set_busy("Chargement des données...")
+        self.run_in_background(load_dataset, self.on_data_loaded,
+                               "Erreur lors du chargement des données",
+                               self.data_dir, self.progress_queue.put)
+
+    def on_data_loaded(self, data):
+        self.data = data
+        self._set_ready(data.search_index, f"Prêt : {len(data.clubs)} clubs, {len(data.games)} matchs")
+
+    def on_connected(self, status):
+        self._set_ready(self.client.search_index,
+                        f"Prêt : {status['clubs']} clubs, {status['games']} matchs (serveur {self.client.url})")
+
+    def _set_ready(self, search_index, message):
+        self.search_index = search_index
+        self.comparison_cache.clear()
+        self.club_names = search_index.names
+        self.club1_combo['values'] = self.club_names
+        self.club2_combo['values'] = self.club_names
+        self.compare_button.state(['!disabled'])
+        self.league_button.state(['!disabled'])
+        self._set_idle(message)
+        if profiling.enabled():
+            self._show_profile(self._profile_mark)
+
+    def _show_profile(self, mark):
+        self.profile_var.set(profiling.breakdown(mark))
+
     # ----- Scroll molette verticale -----
     def _on_mousewheel(self, event):
         self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
@@ -129,38 +246,25 @@ class FootballComparisonApp:
         self.canvas.xview_scroll(int(-1 * (event.delta / 120)), "units")
 
     def generate_acronym(self, name):
-        words = name.split()
-        acronym = ''.join(word[0].upper() for word in words if word)
-        return acronym
+        return acronym(name)
 
     def filter_clubs(self, search_var, combo):
-        search_text = search_var.get().lower()
-        filtered_clubs = [
-            name for name in self.club_names
-            if search_text in name.lower() or search_text in self.acronyms[name].lower()
-        ]
+        key = str(combo)
+        if key in self._search_jobs:
+            self.root.after_cancel(self._search_jobs[key])
+        self._search_jobs[key] = self.root.after(self.search_delay_ms, self._run_filter, search_var, combo)
+
+    def _run_filter(self, search_var, combo):
+        self._search_jobs.pop(str(combo), None)
+        if self.search_index is None:
+            return
+        query = search_var.get()
+        # Champ vide : liste complète ; sinon les meilleurs résultats seulement (tri et liste déroulante courts)
+        filtered_clubs = self.search_index.search(query, limit=SEARCH_LIMIT) if query.strip() else self.club_names
         combo['values'] = filtered_clubs
         if filtered_clubs:
             combo.current(0)
 
-    def calculate_wins(self, club_id, matches):
-        wins = 0
-        for _, match in matches.iterrows():
-            if match['home_club_id'] == club_id and match['home_club_goals'] > match['away_club_goals']:
-                wins += 1
-            elif match['away_club_id'] == club_id and match['away_club_goals'] > match['home_club_goals']:
-                wins += 1
-        return wins
-
-    def calculate_goals(self, club_id, matches):
-        total_goals = 0
-        for _, match in matches.iterrows():
-            if match['home_club_id'] == club_id:
-                total_goals += match['home_club_goals']
-            elif match['away_club_id'] == club_id:
-                total_goals += match['away_club_goals']
-        return total_goals
-
     def compare_clubs(self):
         club1_name = self.club1_var.get()
         club2_name = self.club2_var.get()
@@ -173,210 +277,176 @@ class FootballComparisonApp:
             messagebox.showwarning("Attention", "Veuillez sélectionner deux clubs différents !")
             return
 
-        # Effacer le texte précédent
-        self.result_text.delete(1.0, tk.END)
+        # Les listes sont éditables : un nom saisi à la main doit exister
+        known = set(self.club_names)
+        unknown = [name for name in (club1_name, club2_name) if name not in known]
+        if unknown:
+            messagebox.showwarning("Attention", f"Clubs introuvables : {', '.join(unknown)}")
+            return
+
+        try:
+            window = self.selected_window()
+        except ValueError as e:
+            messagebox.showwarning("Attention", f"Période invalide : {str(e)}")
+            return
+
+        self._set_busy("Calcul de la comparaison...")
+        self._profile_mark = profiling.mark()
+        self.run_in_background(self.compute_comparison, self.show_comparison,
+                               "Erreur lors de la comparaison", club1_name, club2_name, window,
+                               button=self.compare_button)
+
+    def selected_window(self):
+        choice = self.window_var.get()
+        if choice in PRESETS:
+            return Window.last_years(PRESETS[choice])
+        return Window.between(self.since_var.get().strip() or None, self.until_var.get().strip() or None)
+
+    def compute_comparison(self, club1_name, club2_name, window):
+        # Exécuté sur le thread de travail : aucun accès aux widgets ici
+        if self.client is not None:
+            return self.client.compare(club1_name, club2_name, window)
+        return build_report(self.data, club1_name, club2_name, window, self.comparison_cache)
+
+    def show_comparison(self, report):
+        cache = (self.client or self.comparison_cache).info()
+        self._set_idle(f"Prêt (cache : {cache['hits']} réutilisées, {cache['misses']} calculées)")
+
+        with profiling.span('render.text'):
+            # Effacer le texte précédent
+            self.result_text.delete(1.0, tk.END)
+            self.result_text.insert(tk.END, self.format_comparison(report))
+        with profiling.span('render.figure'):
+            self.update_plot(report)
+        self.result_text.update_idletasks()
+
+        if profiling.enabled():
+            # Après le dessin du graphique s'il a été différé (draw_idle)
+            self.root.after_idle(self._show_profile, self._profile_mark)
 
-        # Récupérer les IDs des clubs
-        club1_id = self.clubs_df[self.clubs_df['name'] == club1_name]['club_id'].iloc[0]
-        club2_id = self.clubs_df[self.clubs_df['name'] == club2_name]['club_id'].iloc[0]
-
-        # Statistiques des clubs (globales)
-        club1_info = self.clubs_df[self.clubs_df['club_id'] == club1_id]
-        club2_info = self.clubs_df[self.clubs_df['club_id'] == club2_id]
-
-        # Statistiques des joueurs (globales, car actuelles)
-        club1_players = self.players_df[self.players_df['current_club_id'] == club1_id]
-        club2_players = self.players_df[self.players_df['current_club_id'] == club2_id]
-
-        # ----- Statistiques générales -----
-        club1_matches = self.games_df[(self.games_df['home_club_id'] == club1_id) | (self.games_df['away_club_id'] == club1_id)]
-        club2_matches = self.games_df[(self.games_df['home_club_id'] == club2_id) | (self.games_df['away_club_id'] == club2_id)]
-
-        club1_wins = self.calculate_wins(club1_id, club1_matches)
-        club2_wins = self.calculate_wins(club2_id, club2_matches)
-        club1_goals = self.calculate_goals(club1_id, club1_matches)
-        club2_goals = self.calculate_goals(club2_id, club2_matches)
-
-        club1_total_matches = len(club1_matches)
-        club2_total_matches = len(club2_matches)
-        winrate1 = (club1_wins / club1_total_matches * 100) if club1_total_matches > 0 else 0
-        winrate2 = (club2_wins / club2_total_matches * 100) if club2_total_matches > 0 else 0
-        avg_goals1 = club1_goals / club1_total_matches if club1_total_matches > 0 else 0
-        avg_goals2 = club2_goals / club2_total_matches if club2_total_matches > 0 else 0
-
-        # Face à face général
-        head_to_head = self.games_df[
-            ((self.games_df['home_club_id'] == club1_id) & (self.games_df['away_club_id'] == club2_id)) |
-            ((self.games_df['home_club_id'] == club2_id) & (self.games_df['away_club_id'] == club1_id))
-        ]
-        club1_head_wins = 0
-        club2_head_wins = 0
-        club1_head_goals = 0
-        club2_head_goals = 0
-        for _, match in head_to_head.iterrows():
-            if match['home_club_goals'] > match['away_club_goals']:
-                if match['home_club_id'] == club1_id:
-                    club1_head_wins += 1
-                    club1_head_goals += match['home_club_goals']
-                    club2_head_goals += match['away_club_goals']
-                else:
-                    club2_head_wins += 1
-                    club1_head_goals += match['away_club_goals']
-                    club2_head_goals += match['home_club_goals']
-            elif match['home_club_goals'] < match['away_club_goals']:
-                if match['away_club_id'] == club1_id:
-                    club1_head_wins += 1
-                    club1_head_goals += match['away_club_goals']
-                    club2_head_goals += match['home_club_goals']
-                else:
-                    club2_head_wins += 1
-                    club1_head_goals += match['home_club_goals']
-                    club2_head_goals += match['away_club_goals']
-            else:  # Match nul
-                club1_head_goals += match['away_club_goals'] if match['away_club_id'] == club1_id else match['home_club_goals']
-                club2_head_goals += match['away_club_goals'] if match['away_club_id'] == club2_id else match['home_club_goals']
-
-        total_h2h = len(head_to_head)
-        proba1 = (club1_head_wins + 1) / (total_h2h + 2) if total_h2h > 0 else 0.5
-        proba2 = (club2_head_wins + 1) / (total_h2h + 2) if total_h2h > 0 else 0.5
-        avg_head_goals1 = club1_head_goals / total_h2h if total_h2h > 0 else 0
-        avg_head_goals2 = club2_head_goals / total_h2h if total_h2h > 0 else 0
-
-        # ----- Statistiques récentes (5 dernières années) -----
-        club1_matches_recent = self.games_df_recent[(self.games_df_recent['home_club_id'] == club1_id) | (self.games_df_recent['away_club_id'] == club1_id)]
-        club2_matches_recent = self.games_df_recent[(self.games_df_recent['home_club_id'] == club2_id) | (self.games_df_recent['away_club_id'] == club2_id)]
-
-        club1_wins_recent = self.calculate_wins(club1_id, club1_matches_recent)
-        club2_wins_recent = self.calculate_wins(club2_id, club2_matches_recent)
-        club1_goals_recent = self.calculate_goals(club1_id, club1_matches_recent)
-        club2_goals_recent = self.calculate_goals(club2_id, club2_matches_recent)
-
-        club1_total_matches_recent = len(club1_matches_recent)
-        club2_total_matches_recent = len(club2_matches_recent)
-        winrate1_recent = (club1_wins_recent / club1_total_matches_recent * 100) if club1_total_matches_recent > 0 else 0
-        winrate2_recent = (club2_wins_recent / club2_total_matches_recent * 100) if club2_total_matches_recent > 0 else 0
-        avg_goals1_recent = club1_goals_recent / club1_total_matches_recent if club1_total_matches_recent > 0 else 0
-        avg_goals2_recent = club2_goals_recent / club2_total_matches_recent if club2_total_matches_recent > 0 else 0
-
-        # Face à face récent
-        head_to_head_recent = self.games_df_recent[
-            ((self.games_df_recent['home_club_id'] == club1_id) & (self.games_df_recent['away_club_id'] == club2_id)) |
-            ((self.games_df_recent['home_club_id'] == club2_id) & (self.games_df_recent['away_club_id'] == club1_id))
-        ]
-        club1_head_wins_recent = 0
-        club2_head_wins_recent = 0
-        club1_head_goals_recent = 0
-        club2_head_goals_recent = 0
-        draws_recent = 0
-        for _, match in head_to_head_recent.iterrows():
-            if match['home_club_goals'] > match['away_club_goals']:
-                if match['home_club_id'] == club1_id:
-                    club1_head_wins_recent += 1
-                    club1_head_goals_recent += match['home_club_goals']
-                    club2_head_goals_recent += match['away_club_goals']
-                else:
-                    club2_head_wins_recent += 1
-                    club1_head_goals_recent += match['away_club_goals']
-                    club2_head_goals_recent += match['home_club_goals']
-            elif match['home_club_goals'] < match['away_club_goals']:
-                if match['away_club_id'] == club1_id:
-                    club1_head_wins_recent += 1
-                    club1_head_goals_recent += match['away_club_goals']
-                    club2_head_goals_recent += match['home_club_goals']
-                else:
-                    club2_head_wins_recent += 1
-                    club1_head_goals_recent += match['home_club_goals']
-                    club2_head_goals_recent += match['away_club_goals']
-            else:  # Match nul
-                draws_recent += 1
-                club1_head_goals_recent += match['away_club_goals'] if match['away_club_id'] == club1_id else match['home_club_goals']
-                club2_head_goals_recent += match['away_club_goals'] if match['away_club_id'] == club2_id else match['home_club_goals']
-
-        total_h2h_recent = len(head_to_head_recent)
-        proba1_recent = (club1_head_wins_recent + 1) / (total_h2h_recent + 2) if total_h2h_recent > 0 else 0.5
-        proba2_recent = (club2_head_wins_recent + 1) / (total_h2h_recent + 2) if total_h2h_recent > 0 else 0.5
-        proba_draw_recent = (draws_recent + 1) / (total_h2h_recent + 2) if total_h2h_recent > 0 else 0.5
-        avg_head_goals1_recent = club1_head_goals_recent / total_h2h_recent if total_h2h_recent > 0 else 0
-        avg_head_goals2_recent = club2_head_goals_recent / total_h2h_recent if total_h2h_recent > 0 else 0
+    def format_comparison(self, report):
+        club1_name, club2_name = report.club1_name, report.club2_name
+        comparison, prediction, goals, simulation = (report.comparison, report.prediction, report.goals,
+                                                     report.simulation)
+        club1, club2 = comparison.club1, comparison.club2
+        h2h = comparison.head_to_head
+        club1_window, club2_window = comparison.club1_window, comparison.club2_window
+        h2h_window = comparison.head_to_head_window
+        window = comparison.window
 
         # ----- Affichage des résultats -----
-        cutoff_date = (datetime.now() - timedelta(days=5*365)).strftime('%Y-%m-%d')
         result = f"Comparaison entre {club1_name} et {club2_name}\n\n"
         
         # Statistiques générales
         result += f"===== Statistiques générales =====\n"
         result += f"--- {club1_name} ---\n"
-        result += f"Nombre de joueurs: {len(club1_players)}\n"
-        result += f"Matchs joués: {club1_total_matches}\n"
-        result += f"Matchs gagnés: {club1_wins}\n"
-        result += f"Win%: {winrate1:.2f}%\n"
-        result += f"Buts marqués: {club1_goals}\n"
-        result += f"Moyenne de buts par match: {avg_goals1:.2f}\n"
-        result += f"Valeur totale du marché (M€): {club1_info['total_market_value'].iloc[0] if not pd.isna(club1_info['total_market_value'].iloc[0]) else 'N/A'}\n"
-        result += f"Taille moyenne de l'effectif: {club1_info['squad_size'].iloc[0]}\n\n"
+        result += f"Nombre de joueurs: {report.club1_players}\n"
+        result += f"Matchs joués: {club1.matches}\n"
+        result += f"Matchs gagnés: {club1.wins}\n"
+        result += f"Win%: {club1.winrate:.2f}%\n"
+        result += f"Buts marqués: {club1.goals_for}\n"
+        result += f"Moyenne de buts par match: {club1.avg_goals:.2f}\n"
+        result += f"Valeur totale du marché (M€): {report.club1_market_value if report.club1_market_value is not None else 'N/A'}\n"
+        result += f"Taille moyenne de l'effectif: {report.club1_squad_size if report.club1_squad_size is not None else 'N/A'}\n\n"
 
         result += f"--- {club2_name} ---\n"
-        result += f"Nombre de joueurs: {len(club2_players)}\n"
-        result += f"Matchs joués: {club2_total_matches}\n"
-        result += f"Matchs gagnés: {club2_wins}\n"
-        result += f"Win%: {winrate2:.2f}%\n"
-        result += f"Buts marqués: {club2_goals}\n"
-        result += f"Moyenne de buts par match: {avg_goals2:.2f}\n"
-        result += f"Valeur totale du marché (M€): {club2_info['total_market_value'].iloc[0] if not pd.isna(club2_info['total_market_value'].iloc[0]) else 'N/A'}\n"
-        result += f"Taille moyenne de l'effectif: {club2_info['squad_size'].iloc[0]}\n\n"
+        result += f"Nombre de joueurs: {report.club2_players}\n"
+        result += f"Matchs joués: {club2.matches}\n"
+        result += f"Matchs gagnés: {club2.wins}\n"
+        result += f"Win%: {club2.winrate:.2f}%\n"
+        result += f"Buts marqués: {club2.goals_for}\n"
+        result += f"Moyenne de buts par match: {club2.avg_goals:.2f}\n"
+        result += f"Valeur totale du marché (M€): {report.club2_market_value if report.club2_market_value is not None else 'N/A'}\n"
+        result += f"Taille moyenne de l'effectif: {report.club2_squad_size if report.club2_squad_size is not None else 'N/A'}\n\n"
 
         result += f"--- Face à face général ---\n"
-        result += f"Nombre de confrontations: {total_h2h}\n"
-        result += f"Victoires {club1_name}: {club1_head_wins}\n"
-        result += f"Victoires {club2_name}: {club2_head_wins}\n"
-        result += f"Buts marqués {club1_name}: {club1_head_goals}\n"
-        result += f"Buts marqués {club2_name}: {club2_head_goals}\n"
-        result += f"Moyenne de buts par match {club1_name}: {avg_head_goals1:.2f}\n"
-        result += f"Moyenne de buts par match {club2_name}: {avg_head_goals2:.2f}\n"
-        result += f"{club1_name} gagne (proba Laplace): {proba1:.2f}\n"
-        result += f"{club2_name} gagne (proba Laplace): {proba2:.2f}\n\n"
-
-        # Statistiques récentes
-        result += f"===== Statistiques des 5 dernières années (depuis {cutoff_date}) =====\n"
+        result += f"Nombre de confrontations: {h2h.matches}\n"
+        result += f"Victoires {club1_name}: {h2h.wins1}\n"
+        result += f"Victoires {club2_name}: {h2h.wins2}\n"
+        result += f"Buts marqués {club1_name}: {h2h.goals1}\n"
+        result += f"Buts marqués {club2_name}: {h2h.goals2}\n"
+        result += f"Moyenne de buts par match {club1_name}: {h2h.avg_goals1:.2f}\n"
+        result += f"Moyenne de buts par match {club2_name}: {h2h.avg_goals2:.2f}\n"
+        result += f"{club1_name} gagne (proba Laplace): {h2h.proba1:.2f}\n"
+        result += f"{club2_name} gagne (proba Laplace): {h2h.proba2:.2f}\n\n"
+
+        result += f"--- Classement Elo ---\n"
+        result += f"Elo {club1_name}: {prediction.rating1:.0f}\n"
+        result += f"Elo {club2_name}: {prediction.rating2:.0f}\n"
+        result += f"{club1_name} gagne (proba Elo): {prediction.win1:.2f}\n"
+        result += f"{club2_name} gagne (proba Elo): {prediction.win2:.2f}\n"
+        result += f"Match nul (proba Elo): {prediction.draw:.2f}\n\n"
+
+        result += f"--- Modèle de buts (Poisson, terrain neutre) ---\n"
+        result += f"Buts attendus {club1_name}: {goals.expected1:.2f}\n"
+        result += f"Buts attendus {club2_name}: {goals.expected2:.2f}\n"
+        result += f"{club1_name} gagne (proba Poisson): {goals.win1:.2f}\n"
+        result += f"{club2_name} gagne (proba Poisson): {goals.win2:.2f}\n"
+        result += f"Match nul (proba Poisson): {goals.draw:.2f}\n"
+        result += "Scores les plus probables: " + ", ".join(
+            f"{i}-{j} ({p:.1%})" for i, j, p in goals.top_scores(5)) + "\n\n"
+
+        result += f"--- Simulation Monte Carlo ({simulation.n} matchs) ---\n"
+        result += f"{club1_name} gagne: {simulation.win1:.2%}\n"
+        result += f"{club2_name} gagne: {simulation.win2:.2%}\n"
+        result += f"Match nul: {simulation.draw:.2%}\n"
+        result += f"Points attendus {club1_name}: {simulation.points1:.2f}\n"
+        result += f"Points attendus {club2_name}: {simulation.points2:.2f}\n\n"
+
+        if report.squads is not None:
+            result += self.format_squad(club1_name, *report.squads[0])
+            result += self.format_squad(club2_name, *report.squads[1])
+
+        # Statistiques sur la fenêtre choisie
+        result += f"===== Statistiques : {window.label} ({window.period()}) =====\n"
         result += f"--- {club1_name} ---\n"
-        result += f"Matchs joués: {club1_total_matches_recent}\n"
-        result += f"Matchs gagnés: {club1_wins_recent}\n"
-        result += f"Win%: {winrate1_recent:.2f}%\n"
-        result += f"Buts marqués: {club1_goals_recent}\n"
-        result += f"Moyenne de buts par match: {avg_goals1_recent:.2f}\n\n"
+        result += f"Matchs joués: {club1_window.matches}\n"
+        result += f"Matchs gagnés: {club1_window.wins}\n"
+        result += f"Win%: {club1_window.winrate:.2f}%\n"
+        result += f"Buts marqués: {club1_window.goals_for}\n"
+        result += f"Moyenne de buts par match: {club1_window.avg_goals:.2f}\n\n"
 
         result += f"--- {club2_name} ---\n"
-        result += f"Matchs joués: {club2_total_matches_recent}\n"
-        result += f"Matchs gagnés: {club2_wins_recent}\n"
-        result += f"Win%: {winrate2_recent:.2f}%\n"
-        result += f"Buts marqués: {club2_goals_recent}\n"
-        result += f"Moyenne de buts par match: {avg_goals2_recent:.2f}\n\n"
-
-        result += f"--- Face à face (5 dernières années) ---\n"
-        result += f"Nombre de confrontations: {total_h2h_recent}\n"
-        result += f"Victoires {club1_name}: {club1_head_wins_recent}\n"
-        result += f"Victoires {club2_name}: {club2_head_wins_recent}\n"
-        result += f"Matchs nuls: {draws_recent}\n"
-        result += f"Buts marqués {club1_name}: {club1_head_goals_recent}\n"
-        result += f"Buts marqués {club2_name}: {club2_head_goals_recent}\n"
-        result += f"Moyenne de buts par match {club1_name}: {avg_head_goals1_recent:.2f}\n"
-        result += f"Moyenne de buts par match {club2_name}: {avg_head_goals2_recent:.2f}\n"
-        result += f"{club1_name} gagne (proba Laplace): {proba1_recent:.2f}\n"
-        result += f"{club2_name} gagne (proba Laplace): {proba2_recent:.2f}\n"
-        result += f"Match nul (proba Laplace): {proba_draw_recent:.2f}\n"
-
-        # ----- Graphique pour face-à-face récent -----
-        if total_h2h_recent > 0:
-            mu = club1_head_wins_recent / total_h2h_recent
-            mu2 = club2_head_wins_recent / total_h2h_recent
-            mu3 = draws_recent / total_h2h_recent
+        result += f"Matchs joués: {club2_window.matches}\n"
+        result += f"Matchs gagnés: {club2_window.wins}\n"
+        result += f"Win%: {club2_window.winrate:.2f}%\n"
+        result += f"Buts marqués: {club2_window.goals_for}\n"
+        result += f"Moyenne de buts par match: {club2_window.avg_goals:.2f}\n\n"
+
+        result += f"--- Face à face ({window.label}) ---\n"
+        result += f"Nombre de confrontations: {h2h_window.matches}\n"
+        result += f"Victoires {club1_name}: {h2h_window.wins1}\n"
+        result += f"Victoires {club2_name}: {h2h_window.wins2}\n"
+        result += f"Matchs nuls: {h2h_window.draws}\n"
+        result += f"Buts marqués {club1_name}: {h2h_window.goals1}\n"
+        result += f"Buts marqués {club2_name}: {h2h_window.goals2}\n"
+        result += f"Moyenne de buts par match {club1_name}: {h2h_window.avg_goals1:.2f}\n"
+        result += f"Moyenne de buts par match {club2_name}: {h2h_window.avg_goals2:.2f}\n"
+        result += f"{club1_name} gagne (proba Laplace): {h2h_window.proba1:.2f}\n"
+        result += f"{club2_name} gagne (proba Laplace): {h2h_window.proba2:.2f}\n"
+        result += f"Match nul (proba Laplace): {h2h_window.proba_draw:.2f}\n"
+
+        return result
+
+    def update_plot(self, report):
+        club1_name, club2_name = report.club1_name, report.club2_name
+        simulation = report.simulation
+        h2h_window = report.comparison.head_to_head_window
+        window = report.comparison.window
+
+        # ----- Graphique pour le face-à-face sur la fenêtre -----
+        total_h2h_window = h2h_window.matches
+        if total_h2h_window > 0:
+            mu = h2h_window.wins1 / total_h2h_window
+            mu2 = h2h_window.wins2 / total_h2h_window
+            mu3 = h2h_window.draws / total_h2h_window
 
             # Variance corrigée pour la distribution binomiale
-            variance1 = (mu * (1 - mu2)) / total_h2h_recent if total_h2h_recent > 0 else 0.1
+            variance1 = (mu * (1 - mu2)) / total_h2h_window if total_h2h_window > 0 else 0.1
             sigma1 = np.sqrt(max(variance1, 0.01))  # Minimum pour éviter une courbe trop étroite
-            variance2 = (mu2 * (1 - mu)) / total_h2h_recent if total_h2h_recent > 0 else 0.1
+            variance2 = (mu2 * (1 - mu)) / total_h2h_window if total_h2h_window > 0 else 0.1
             sigma2 = np.sqrt(max(variance2, 0.01))
-            variance3 = (mu3 * (1 - mu3)) / total_h2h_recent if total_h2h_recent > 0 else 0.1
+            variance3 = (mu3 * (1 - mu3)) / total_h2h_window if total_h2h_window > 0 else 0.1
             sigma3 = np.sqrt(max(variance3, 0.01))
 
             x = np.linspace(0, 1, 100)
@@ -384,46 +454,80 @@ class FootballComparisonApp:
             y2 = norm.pdf(x, mu2, sigma2)
             y3 = norm.pdf(x, mu3, sigma3)
 
-            # Supprimer un éventuel graphique précédent
-            for widget in self.main_frame.grid_slaves():
-                if isinstance(widget, FigureCanvasTkAgg):
-                    widget.destroy()
-            
-            r = np.random.rand(1)[0]
-            
-            # Créer une figure matplotlib
-            fig = Figure(figsize=(10, 6), dpi=100)
-            ax = fig.add_subplot(111)
-            ax.plot(x, y, label=f'Taux de victoire {club1_name}: {mu:.2f}', color='blue')
-            ax.axvline(mu, color='blue', linestyle='--')
-            ax.plot(x, y2, label=f'Taux de victoire {club2_name}: {mu2:.2f}', color='red')
-            ax.axvline(mu2, color='red', linestyle='--')
-            ax.plot(x, y3, label=f'Match nul: {mu3:.2f}', color='green')
-            ax.axvline(mu3, color='green', linestyle='--')
-            ax.axvline(r, color='black', linestyle=':', label='Tirage aléatoire')
-            
-            ax.set_title(f"Densité de probabilité (5 dernières années, depuis {cutoff_date})")
-            ax.set_xlabel("Taux")
-            ax.set_ylabel("Densité")
-            ax.legend()
-            
-            # Intégrer la figure dans Tkinter
-            canvas = FigureCanvasTkAgg(fig, master=self.main_frame)
-            canvas.draw()
-            canvas_widget = canvas.get_tk_widget()
-            canvas_widget.grid(row=6, column=0, columnspan=2, pady=10)
-            
+            # Mettre à jour le graphique existant (pas de nouvelle figure à chaque clic)
+            self.plot.update(x, [(y, mu, f'Taux de victoire {club1_name}: {mu:.2f}'),
+                                 (y2, mu2, f'Taux de victoire {club2_name}: {mu2:.2f}'),
+                                 (y3, mu3, f'Match nul: {mu3:.2f}')],
+                             (simulation.win1, f'Simulation : {club1_name} gagne {simulation.win1:.2f}'),
+                             f"Densité de probabilité ({window.label}, {window.period()})")
+
             # Forcer la mise à jour de la région de défilement
             self.canvas.update_idletasks()
             self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        else:
+            self.plot.hide()
+
+    def format_squad(self, club_name, season, trend):
+        if season is None:
+            return f"--- Effectif {club_name} ---\nAucune donnée de joueurs\n\n"
+        result = f"--- Effectif {club_name} (saison {season['season']}/{season['season'] + 1}) ---\n"
+        for column, label in (('goals', 'Buts des joueurs'), ('assists', 'Passes décisives'),
+                              ('minutes_played', 'Minutes jouées'), ('yellow_cards', 'Cartons jaunes'),
+                              ('red_cards', 'Cartons rouges')):
+            if season.get(column) is not None:
+                result += f"{label}: {int(season[column])}\n"
+        if trend:
+            values = " -> ".join(f"{year}: {value / 1e6:.1f}" for year, value in trend)
+            result += f"Valeur de l'effectif (M€): {values}\n"
+        return result + "\n"
+
+    # ----- Mini-championnat -----
+    def simulate_league(self):
+        names = [name.strip() for name in self.league_var.get().split(';') if name.strip()]
+        known = set(self.club_names)
+        unknown = [name for name in names if name not in known]
+        if unknown:
+            messagebox.showwarning("Attention", f"Clubs introuvables : {', '.join(unknown)}")
+            return
+        if len(set(names)) < 2:
+            messagebox.showwarning("Attention", "Veuillez saisir au moins deux clubs différents !")
+            return
 
-        self.result_text.insert(tk.END, result)
-        self.result_text.update_idletasks()
+        names = list(dict.fromkeys(names))
+        self._set_busy("Simulation du championnat...")
+        self.run_in_background(self.compute_league, lambda league: self.show_league(names, league),
+                               "Erreur lors de la simulation", names, button=self.league_button)
 
+    def compute_league(self, names):
+        if self.client is not None:
+            return self.client.league(names)
+        return build_league(self.data, names)
 
+    def show_league(self, names, league):
+        self._set_idle("Prêt")
+
+        result = f"===== Mini-championnat aller-retour ({league.n} saisons simulées) =====\n"
+        order = np.argsort(-league.expected_points)
+        for rank, i in enumerate(order, start=1):
+            positions = ", ".join(f"{p + 1}e: {league.positions[i, p]:.0%}" for p in range(len(names)))
+            result += (f"{rank}. {names[i]}: {league.expected_points[i]:.1f} pts, "
+                       f"diff. {league.expected_goal_difference[i]:+.1f} ({positions})\n")
+
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, result)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comparaison des clubs de football")
+    parser.add_argument("--data-dir", help="Dossier local du jeu de données (pas de téléchargement Kaggle)")
+    parser.add_argument("--server", help="URL d'un service partagé (python server.py), ex. http://127.0.0.1:8765")
+    parser.add_argument("--profile", nargs="?", const="", metavar="FICHIER",
+                        help="Mesurer les temps (barre d'état) ; export à la sortie vers FICHIER "
+                             "(JSON, ou trace Chrome si le nom finit par .trace.json)")
+    args = parser.parse_args()
+    if args.profile is not None:
+        profiling.enable(args.profile or None)
+
     root = tk.Tk()
-    app = FootballComparisonApp(root)
-    root.mainloop()
\ No newline at end of file
+    app = FootballComparisonApp(root, data_dir=args.data_dir, server=args.server)
+    root.mainloop()